@@ -329,6 +329,13 @@ async def verify_token_from_query(token: str) -> User:
 	return User(email=email)
 
 
+_SCREENSHOT_MEDIA_TYPES = {
+	".png": "image/png",
+	".jpg": "image/jpeg",
+	".jpeg": "image/jpeg",
+}
+
+
 @router.get("/screenshot")
 async def get_screenshot(
 	path: str,
@@ -357,13 +364,14 @@ async def get_screenshot(
 	if not screenshot_path.is_file():
 		raise HTTPException(status_code=400, detail="Path is not a file")
 
-	# Security check: ensure it's a PNG file
-	if screenshot_path.suffix.lower() != ".png":
+	# Security check: only serve image files (step screenshots are JPEG, errors PNG)
+	media_type = _SCREENSHOT_MEDIA_TYPES.get(screenshot_path.suffix.lower())
+	if media_type is None:
 		raise HTTPException(status_code=400, detail="Invalid file type")
 
 	return FileResponse(
 		path=screenshot_path,
-		media_type="image/png",
+		media_type=media_type,
 		filename=screenshot_path.name,
 	)
 
@@ -13,15 +13,17 @@ Endpoints:
 """
 
 import logging
+from dataclasses import asdict
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
-from app.models import PlaywrightScript, TestRun, RunStep, TestSession
+from app.models import PlaywrightScript, TestRun, RunStep, TestSession, TestStep
 from app.schemas import (
 	CreateScriptRequest,
 	PlaywrightScriptResponse,
@@ -36,7 +38,7 @@ from app.schemas import (
 	WSRunStepCompleted,
 	WSRunCompleted,
 )
-from app.services.script_recorder import PlaywrightStep, ScriptRecorder
+from app.services.script_recorder import PlaywrightStep, ScriptRecorder, parse_steps
 from app.services.base_runner import StepResult
 from app.services.runner_factory import create_runner, RunnerType
 
@@ -49,7 +51,13 @@ runs_router = APIRouter(prefix="/runs", tags=["runs"])
 @router.post("", response_model=PlaywrightScriptResponse)
 async def create_script(request: CreateScriptRequest, db: Session = Depends(get_db)):
 	"""Create a Playwright script from a completed test session."""
-	session = db.query(TestSession).filter(TestSession.id == request.session_id).first()
+	# Load steps and their actions up front; the conversion below walks all of them
+	session = (
+		db.query(TestSession)
+		.options(selectinload(TestSession.steps).selectinload(TestStep.actions))
+		.filter(TestSession.id == request.session_id)
+		.first()
+	)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
 	
@@ -85,105 +93,131 @@ async def create_script(request: CreateScriptRequest, db: Session = Depends(get_
 
 def _extract_steps_from_session(session: TestSession) -> list[dict[str, Any]]:
 	"""Extract Playwright steps from a completed session's actions."""
-	steps = []
-	step_index = 0
+	steps: list[dict[str, Any]] = []
+	append = steps.append
 	
 	for test_step in session.steps:
+		url = test_step.url
 		for action in test_step.actions:
-			playwright_step = _convert_action_to_playwright_step(action, step_index, test_step.url)
+			# Actions that failed during the session did not change the page; don't replay them
+			if action.result_success is False:
+				continue
+			playwright_step = _convert_action_to_playwright_step(action, len(steps), url)
 			if playwright_step:
-				steps.append(playwright_step)
-				step_index += 1
+				append(playwright_step)
 	
 	return steps
 
 
 def _convert_action_to_playwright_step(action, index: int, url: str | None) -> dict[str, Any] | None:
 	"""Convert a StepAction to a PlaywrightStep dict."""
-	action_name = action.action_name.lower()
-	params = action.action_params or {}
-	
-	# Map browser-use actions to Playwright actions
-	if "navigate" in action_name or "goto" in action_name:
-		return {
-			"index": index,
-			"action": "goto",
-			"url": params.get("url", url),
-			"wait_for": "domcontentloaded",
-			"description": f"Navigate to {params.get('url', url)}",
-		}
-	
-	elif "click" in action_name:
-		selectors = _build_selectors(action)
-		return {
-			"index": index,
-			"action": "click",
-			"selectors": selectors,
-			"element_context": _build_element_context(action),
-			"description": action.element_name or "Click element",
-		}
-	
-	elif "input" in action_name or "type" in action_name or "fill" in action_name:
-		selectors = _build_selectors(action)
-		return {
-			"index": index,
-			"action": "fill",
-			"selectors": selectors,
-			"value": params.get("text", ""),
-			"element_context": _build_element_context(action),
-			"description": f"Fill with '{params.get('text', '')[:20]}'",
-		}
-	
-	elif "scroll" in action_name:
-		return {
-			"index": index,
-			"action": "scroll",
-			"direction": "down" if params.get("down", True) else "up",
-			"amount": int(params.get("pages", 1) * 500),
-			"description": "Scroll page",
-		}
-	
-	elif "wait" in action_name:
-		return {
-			"index": index,
-			"action": "wait",
-			"timeout": params.get("seconds", 1) * 1000,
-			"description": f"Wait {params.get('seconds', 1)} seconds",
-		}
-	
-	elif "select" in action_name:
-		selectors = _build_selectors(action)
-		return {
-			"index": index,
-			"action": "select",
-			"selectors": selectors,
-			"value": params.get("value", ""),
-			"description": f"Select '{params.get('value', '')}'",
-		}
-	
+	builder = _builder_for(action.action_name.lower())
+	if builder is None:
+		return None
+	return builder(action, action.action_params or {}, index, url)
+
+
+def _goto_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	target = params.get("url", url)
+	return {
+		"index": index,
+		"action": "goto",
+		"url": target,
+		"wait_for": "domcontentloaded",
+		"description": f"Navigate to {target}",
+	}
+
+
+def _click_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	return {
+		"index": index,
+		"action": "click",
+		"selectors": _build_selectors(action, params),
+		"element_context": _build_element_context(action, params),
+		"description": action.element_name or "Click element",
+	}
+
+
+def _fill_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	text = params.get("text", "")
+	return {
+		"index": index,
+		"action": "fill",
+		"selectors": _build_selectors(action, params),
+		"value": text,
+		"element_context": _build_element_context(action, params),
+		"description": f"Fill with '{text[:20]}'",
+	}
+
+
+def _scroll_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	return {
+		"index": index,
+		"action": "scroll",
+		"direction": "down" if params.get("down", True) else "up",
+		"amount": int(params.get("pages", 1) * 500),
+		"description": "Scroll page",
+	}
+
+
+def _wait_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	seconds = params.get("seconds", 1)
+	return {
+		"index": index,
+		"action": "wait",
+		"timeout": seconds * 1000,
+		"description": f"Wait {seconds} seconds",
+	}
+
+
+def _select_step(action, params: dict[str, Any], index: int, url: str | None) -> dict[str, Any]:
+	value = params.get("value", "")
+	return {
+		"index": index,
+		"action": "select",
+		"selectors": _build_selectors(action, params),
+		"value": value,
+		"description": f"Select '{value}'",
+	}
+
+
+# Map browser-use actions to Playwright actions: name keywords -> step builder, first match wins
+_ACTION_BUILDERS = (
+	(("navigate", "goto"), _goto_step),
+	(("click",), _click_step),
+	(("input", "type", "fill"), _fill_step),
+	(("scroll",), _scroll_step),
+	(("wait",), _wait_step),
+	(("select",), _select_step),
+)
+
+
+@lru_cache(maxsize=128)
+def _builder_for(action_name: str):
+	"""Resolve (once per distinct action name) which step builder handles an action."""
+	for keywords, builder in _ACTION_BUILDERS:
+		if any(keyword in action_name for keyword in keywords):
+			return builder
 	return None
 
 
-def _build_selectors(action) -> dict[str, Any]:
+def _build_selectors(action, params: dict[str, Any]) -> dict[str, Any]:
 	"""Build selector set from action."""
 	primary = action.element_xpath or "body"
-	fallbacks = []
+	if not primary.startswith("xpath="):
+		primary = "xpath=" + primary
 	
 	# Add CSS selector if we can derive it
-	params = action.action_params or {}
-	if params.get("css_selector"):
-		fallbacks.append(params["css_selector"])
+	css_selector = params.get("css_selector")
 	
 	return {
-		"primary": f"xpath={primary}" if not primary.startswith("xpath=") else primary,
-		"fallbacks": fallbacks,
+		"primary": primary,
+		"fallbacks": [css_selector] if css_selector else [],
 	}
 
 
-def _build_element_context(action) -> dict[str, Any] | None:
+def _build_element_context(action, params: dict[str, Any]) -> dict[str, Any] | None:
 	"""Build element context from action."""
-	params = action.action_params or {}
-	
 	return {
 		"tag_name": params.get("tag_name", "element"),
 		"text_content": action.element_name,
@@ -347,7 +381,7 @@ async def run_websocket(websocket: WebSocket, run_id: str, db: Session = Depends
 				screenshot_path=result.screenshot_path,
 				duration_ms=result.duration_ms,
 				error_message=result.error_message,
-				heal_attempts=[ha.__dict__ for ha in result.heal_attempts] if result.heal_attempts else None,
+				heal_attempts=[asdict(ha) for ha in result.heal_attempts] if result.heal_attempts else None,
 			)
 			db.add(run_step)
 			db.commit()
@@ -360,7 +394,7 @@ async def run_websocket(websocket: WebSocket, run_id: str, db: Session = Depends
 		runner_type = RunnerType(run.runner_type or "playwright")
 
 		# Create steps from JSON
-		steps = [PlaywrightStep(**step) for step in script.steps_json]
+		steps = parse_steps(script.steps_json)
 
 		# Run the script using the appropriate runner
 		async with create_runner(
@@ -368,6 +402,8 @@ async def run_websocket(websocket: WebSocket, run_id: str, db: Session = Depends
 			headless=True,
 			on_step_start=on_step_start,
 			on_step_complete=on_step_complete,
+			# Steps are persisted by on_step_complete; the run only needs the totals
+			keep_step_results=False,
 		) as runner:
 			result = await runner.run(steps, run_id)
 		
@@ -5,29 +5,46 @@ This module defines the shared types and abstract base class that both
 PlaywrightRunner and CDPRunner implement.
 """
 
+import asyncio
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Callable, Awaitable, Union, Any
 import inspect
 
 from app.services.script_recorder import PlaywrightStep
 
+logger = logging.getLogger(__name__)
+
+# Routine step screenshots are JPEG (much cheaper to encode and move than PNG);
+# error screenshots stay lossless PNG for debugging
+STEP_SCREENSHOT_QUALITY = 70
+
 # Type for callbacks that can be sync or async
 StepStartCallback = Callable[[int, PlaywrightStep], Union[None, Awaitable[None]]]
 StepCompleteCallback = Callable[[int, "StepResult"], Union[None, Awaitable[None]]]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HealAttempt:
     """Record of a self-healing attempt."""
     selector: str
     success: bool
     error: str | None = None
 
+    @classmethod
+    def failure(cls, selector: str, error: BaseException | str) -> "HealAttempt":
+        """Record a failed attempt, keeping only the first line of the error.
+
+        Playwright errors append a multi-line call log that would otherwise be kept
+        (and persisted) for every failed selector.
+        """
+        return cls(selector=selector, success=False, error=str(error).split("\n", 1)[0])
+
 
-@dataclass
+@dataclass(slots=True)
 class StepResult:
     """Result of executing a single step."""
     step_index: int
@@ -40,7 +57,7 @@ class StepResult:
     heal_attempts: list[HealAttempt] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class RunResult:
     """Result of executing an entire script."""
     status: str  # passed | failed | healed
@@ -50,8 +67,41 @@ class RunResult:
     healed_steps: int
     step_results: list[StepResult] = field(default_factory=list)
     error_message: str | None = None
-    started_at: datetime | None = None
-    completed_at: datetime | None = None
+    started_at_ns: int | None = None  # time.time_ns() at run start
+    completed_at_ns: int | None = None  # time.time_ns() at run end
+
+    @property
+    def started_at(self) -> datetime | None:
+        """Run start as a naive UTC datetime (matches the DB columns)."""
+        return _ns_to_datetime(self.started_at_ns)
+
+    @property
+    def completed_at(self) -> datetime | None:
+        """Run end as a naive UTC datetime (matches the DB columns)."""
+        return _ns_to_datetime(self.completed_at_ns)
+
+
+def ms_to_seconds(ms: int | None, default: float = 1.0) -> float:
+    """Convert a millisecond timeout to seconds; only a missing value uses the default."""
+    return default if ms is None else ms / 1000
+
+
+# CSS string escapes: backslash and double quote escaped literally, control characters as hex
+# escapes ("\a " for a newline). JS-style "\n" would mean a literal "n" inside a CSS string.
+_CSS_STRING_ESCAPES = {c: f"\\{c:x} " for c in (*range(0x20), 0x7F)}
+_CSS_STRING_ESCAPES.update({ord("\\"): "\\\\", ord('"'): '\\"'})
+
+
+def css_quote(value: str) -> str:
+    """Quote a value as a double-quoted CSS string, e.g. for [aria-label=...] selectors."""
+    return '"' + value.translate(_CSS_STRING_ESCAPES) + '"'
+
+
+def _ns_to_datetime(ns: int | None) -> datetime | None:
+    """Convert a time.time_ns() value to a naive UTC datetime."""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).replace(tzinfo=None)
 
 
 class BaseRunner(ABC):
@@ -67,12 +117,20 @@ class BaseRunner(ABC):
         screenshot_dir: str = "data/screenshots/runs",
         on_step_start: StepStartCallback | None = None,
         on_step_complete: StepCompleteCallback | None = None,
+        keep_step_results: bool = True,
     ):
         self.headless = headless
         self.screenshot_dir = Path(screenshot_dir)
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
         self.on_step_start = on_step_start
         self.on_step_complete = on_step_complete
+        # When False, step results are only delivered through on_step_complete and not
+        # accumulated on RunResult.step_results, keeping long runs at a bounded footprint
+        self.keep_step_results = keep_step_results
+        # Screenshot files still being written to disk in the background
+        self._pending_writes: set[asyncio.Task] = set()
+        # First exception raised by a queued callback; it fails the run like an inline call would
+        self._callback_error: Exception | None = None
 
     async def _call_callback(self, callback: Callable | None, *args) -> None:
         """Call a callback, handling both sync and async functions."""
@@ -82,6 +140,45 @@ class BaseRunner(ABC):
         if inspect.iscoroutine(result):
             await result
 
+    async def _drain_callbacks(self, queue: asyncio.Queue) -> None:
+        """Invoke queued (callback, *args) items in order, off the step-execution path.
+
+        The first callback exception is kept for _raise_callback_error(); later callbacks are
+        skipped, as they would have been when a failing callback aborted the run inline.
+        """
+        while True:
+            callback, *args = await queue.get()
+            try:
+                if self._callback_error is None:
+                    # Consumers may open the step's screenshot as soon as they're notified
+                    await self._flush_screenshots()
+                    await self._call_callback(callback, *args)
+            except Exception as e:
+                logger.error("Step callback failed: %s", e)
+                self._callback_error = e
+            finally:
+                queue.task_done()
+
+    def _raise_callback_error(self) -> None:
+        """Re-raise the first exception from a queued callback, if any."""
+        if self._callback_error is not None:
+            raise self._callback_error
+
+    def _write_screenshot_later(self, filepath: Path, data: bytes) -> None:
+        """Write screenshot bytes to disk on a worker thread, off the step path."""
+        task = asyncio.create_task(asyncio.to_thread(filepath.write_bytes, data))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _flush_screenshots(self) -> None:
+        """Wait for background screenshot writes to land on disk."""
+        if not self._pending_writes:
+            return
+        results = await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        for error in results:
+            if isinstance(error, Exception):
+                logger.warning("Failed to write screenshot: %s", error)
+
     @abstractmethod
     async def __aenter__(self) -> "BaseRunner":
         """Initialize browser and return self."""
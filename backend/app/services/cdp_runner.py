@@ -10,10 +10,10 @@ Features:
 
 import asyncio
 import base64
+import json
 import logging
 import re
 import time
-from datetime import datetime
 from typing import Any
 
 from browser_use.browser.session import BrowserSession
@@ -29,10 +29,50 @@ from app.services.base_runner import (
     RunResult,
     StepStartCallback,
     StepCompleteCallback,
+    css_quote,
+    ms_to_seconds,
+    STEP_SCREENSHOT_QUALITY,
 )
 
 logger = logging.getLogger(__name__)
 
+# Parses role selectors of the form role[name='...'] (compiled once, used on every role heal)
+_ROLE_NAME_RE = re.compile(r"(\w+)\[name=['\"](.+)['\"]\]")
+
+# Settle time after the load event so client-rendered content can mount; CDP element
+# lookups and assertions are one-shot and do not wait for elements to appear
+_POST_LOAD_SETTLE_S = 0.5
+
+# How long to wait for a navigation to replace the current document before accepting it
+# as-is (same-document navigations keep the loader and may keep the URL)
+_NAVIGATION_COMMIT_GRACE_S = 1.0
+
+
+def _quote(value: str) -> str:
+    """Quote a value as a JS string literal for CDP expressions (use css_quote for CSS selectors)."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+# true once a scroll of dy from scrollY=before has landed or reached the page edge,
+# otherwise the current scrollY (so the caller can tell when it stops moving)
+_SCROLL_LANDED_JS = """(() => {
+    const before = %(before)r, dy = %(dy)r, y = window.scrollY;
+    const landed = Math.abs(y - before - dy) < 2
+        || (dy < 0 && y <= 0)
+        || (dy > 0 && y >= document.documentElement.scrollHeight - window.innerHeight - 1);
+    return landed || y;
+})()"""
+
+
+# Sets a <select>'s value; the value is passed as a CDP call argument so the
+# declaration is constant and quotes in the value can't break the script
+_SET_SELECT_VALUE_JS = """
+    function(value) {
+        this.value = value;
+        this.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+"""
+
 
 class CDPElementLocator:
     """A locator that tries multiple selectors until one works using CDP."""
@@ -62,7 +102,7 @@ class CDPElementLocator:
             Element if found, None otherwise
         """
         all_selectors = self.selectors.all_selectors()
-        timeout_seconds = timeout / 1000
+        timeout_seconds = ms_to_seconds(timeout)
 
         for selector in all_selectors:
             try:
@@ -82,14 +122,10 @@ class CDPElementLocator:
                     error="Timeout waiting for element"
                 ))
             except Exception as e:
-                self.heal_attempts.append(HealAttempt(
-                    selector=selector,
-                    success=False,
-                    error=str(e)
-                ))
+                self.heal_attempts.append(HealAttempt.failure(selector, e))
 
-        # Try fuzzy matching if element context is available
-        if self.element_context:
+        # Try fuzzy matching if element context has anything to match on
+        if self.element_context and self.element_context.has_fuzzy_hints():
             element = await self._try_fuzzy_match(timeout)
             if element:
                 return element
@@ -138,15 +174,13 @@ class CDPElementLocator:
         cdp_client = self.page._client
 
         try:
-            # Escape quotes in xpath for JavaScript
-            escaped_xpath = xpath.replace('"', '\\"')
             # Use Runtime.evaluate to find element by XPath
             result = await cdp_client.send.Runtime.evaluate(
                 params={
                     'expression': f'''
                         (function() {{
                             const result = document.evaluate(
-                                "{escaped_xpath}",
+                                {_quote(xpath)},
                                 document,
                                 null,
                                 XPathResult.FIRST_ORDERED_NODE_TYPE,
@@ -180,9 +214,6 @@ class CDPElementLocator:
         cdp_client = self.page._client
 
         try:
-            # Escape text for JavaScript
-            escaped_text = text.replace("'", "\\'").replace("\n", "\\n")
-
             result = await cdp_client.send.Runtime.evaluate(
                 params={
                     'expression': f'''
@@ -195,7 +226,7 @@ class CDPElementLocator:
                             );
                             let node;
                             while (node = walker.nextNode()) {{
-                                if (node.innerText && node.innerText.includes('{escaped_text}')) {{
+                                if (node.innerText && node.innerText.includes({_quote(text)})) {{
                                     return node;
                                 }}
                             }}
@@ -224,14 +255,14 @@ class CDPElementLocator:
     async def _find_by_role(self, role_spec: str) -> Element | None:
         """Find element by ARIA role."""
         # Parse role[name='...'] format
-        match = re.match(r"(\w+)\[name=['\"](.+)['\"]\]", role_spec)
+        match = _ROLE_NAME_RE.match(role_spec)
         if match:
             role = match.group(1)
             name = match.group(2)
-            selector = f"[role='{role}'][aria-label='{name}'], [role='{role}']:has-text('{name}')"
+            selector = f"[role={css_quote(role)}][aria-label={css_quote(name)}], [role={css_quote(role)}]:has-text({css_quote(name)})"
         else:
             role = role_spec
-            selector = f"[role='{role}']"
+            selector = f"[role={css_quote(role)}]"
 
         return await self._find_by_css(selector)
 
@@ -249,18 +280,18 @@ class CDPElementLocator:
 
         # Try by aria-label
         if ctx.aria_label:
-            fuzzy_selectors.append(f"[aria-label='{ctx.aria_label}']")
+            fuzzy_selectors.append(f"[aria-label={css_quote(ctx.aria_label)}]")
 
         # Try by placeholder
         if ctx.placeholder:
-            fuzzy_selectors.append(f"[placeholder='{ctx.placeholder}']")
+            fuzzy_selectors.append(f"[placeholder={css_quote(ctx.placeholder)}]")
 
         # Try by tag + classes
         if ctx.tag_name and ctx.classes:
             class_selector = ".".join(ctx.classes[:2])  # Use first 2 classes
             fuzzy_selectors.append(f"{ctx.tag_name}.{class_selector}")
 
-        timeout_seconds = (timeout / 2) / 1000  # Use half timeout for fuzzy
+        timeout_seconds = ms_to_seconds(timeout / 2)  # Use half timeout for fuzzy
 
         for selector in fuzzy_selectors:
             try:
@@ -274,11 +305,7 @@ class CDPElementLocator:
                     self.heal_attempts.append(HealAttempt(selector=selector, success=True))
                     return element
             except Exception as e:
-                self.heal_attempts.append(HealAttempt(
-                    selector=selector,
-                    success=False,
-                    error=str(e)
-                ))
+                self.heal_attempts.append(HealAttempt.failure(selector, e))
 
         return None
 
@@ -299,8 +326,9 @@ class CDPRunner(BaseRunner):
         screenshot_dir: str = "data/screenshots/runs",
         on_step_start: StepStartCallback | None = None,
         on_step_complete: StepCompleteCallback | None = None,
+        keep_step_results: bool = True,
     ):
-        super().__init__(headless, screenshot_dir, on_step_start, on_step_complete)
+        super().__init__(headless, screenshot_dir, on_step_start, on_step_complete, keep_step_results)
 
         self._session: BrowserSession | None = None
         self._page: Page | None = None
@@ -354,17 +382,28 @@ class CDPRunner(BaseRunner):
             passed_steps=0,
             failed_steps=0,
             healed_steps=0,
-            started_at=datetime.utcnow(),
+            started_at_ns=time.time_ns(),
         )
 
+        # Callbacks are drained in order by a background task so slow sinks overlap with the next step
+        callback_queue: asyncio.Queue | None = None
+        callback_task: asyncio.Task | None = None
+        self._callback_error = None
+        if self.on_step_start or self.on_step_complete:
+            callback_queue = asyncio.Queue()
+            callback_task = asyncio.create_task(self._drain_callbacks(callback_queue))
+
         try:
             for step in steps:
+                # A failed step callback (e.g. the DB commit of the previous step) stops the run
+                self._raise_callback_error()
                 logger.debug(f"Executing step {step.index}: {step.action}")
                 if self.on_step_start:
-                    await self._call_callback(self.on_step_start, step.index, step)
+                    callback_queue.put_nowait((self.on_step_start, step.index, step))
 
                 step_result = await self._execute_step(step, run_id)
-                result.step_results.append(step_result)
+                if self.keep_step_results:
+                    result.step_results.append(step_result)
 
                 logger.debug(f"Step {step.index} result: {step_result.status}")
 
@@ -379,7 +418,11 @@ class CDPRunner(BaseRunner):
                     break
 
                 if self.on_step_complete:
-                    await self._call_callback(self.on_step_complete, step.index, step_result)
+                    callback_queue.put_nowait((self.on_step_complete, step.index, step_result))
+
+            if callback_queue is not None:
+                await callback_queue.join()
+                self._raise_callback_error()
 
             # Determine final status
             if result.failed_steps > 0:
@@ -396,7 +439,11 @@ class CDPRunner(BaseRunner):
             result.error_message = str(e)
             logger.exception(f"CDP run {run_id} failed with error: {e}")
         finally:
-            result.completed_at = datetime.utcnow()
+            if callback_queue is not None and callback_task is not None:
+                await callback_queue.join()
+                callback_task.cancel()
+            await self._flush_screenshots()
+            result.completed_at_ns = time.time_ns()
 
         return result
 
@@ -405,64 +452,21 @@ class CDPRunner(BaseRunner):
         start_time = time.time()
 
         try:
-            if step.action == "goto":
-                await self._execute_goto(step)
-                status = "passed"
-                heal_attempts = []
-                selector_used = None
-
-            elif step.action == "click":
-                locator_result = await self._execute_click(step)
-                status = "healed" if locator_result.was_healed() else "passed"
-                heal_attempts = locator_result.heal_attempts
-                selector_used = locator_result.successful_selector
-
-            elif step.action == "fill":
-                locator_result = await self._execute_fill(step)
-                status = "healed" if locator_result.was_healed() else "passed"
-                heal_attempts = locator_result.heal_attempts
-                selector_used = locator_result.successful_selector
-
-            elif step.action == "select":
-                locator_result = await self._execute_select(step)
-                status = "healed" if locator_result.was_healed() else "passed"
-                heal_attempts = locator_result.heal_attempts
-                selector_used = locator_result.successful_selector
-
-            elif step.action == "press":
-                await self._execute_press(step)
-                status = "passed"
-                heal_attempts = []
-                selector_used = None
+            action = self._ACTIONS.get(step.action)
+            if action is None:
+                raise ValueError(f"Unknown action: {step.action}")
+            handler, returns_locator = action
 
-            elif step.action == "scroll":
-                await self._execute_scroll(step)
-                status = "passed"
-                heal_attempts = []
-                selector_used = None
-
-            elif step.action == "wait":
-                await self._execute_wait(step)
-                status = "passed"
-                heal_attempts = []
-                selector_used = None
-
-            elif step.action == "hover":
-                locator_result = await self._execute_hover(step)
-                status = "healed" if locator_result.was_healed() else "passed"
-                heal_attempts = locator_result.heal_attempts
-                selector_used = locator_result.successful_selector
-
-            elif step.action == "assert":
-                assertion_result = await self._execute_assertion(step)
-                status = "passed" if assertion_result["success"] else "failed"
-                heal_attempts = assertion_result.get("heal_attempts", [])
-                selector_used = assertion_result.get("selector_used")
-                if not assertion_result["success"]:
-                    raise AssertionError(assertion_result.get("error", "Assertion failed"))
+            outcome = await handler(self, step)
 
+            if returns_locator:
+                status = "healed" if outcome.was_healed() else "passed"
+                heal_attempts = outcome.heal_attempts
+                selector_used = outcome.successful_selector
             else:
-                raise ValueError(f"Unknown action: {step.action}")
+                status = "passed"
+                heal_attempts = outcome.get("heal_attempts", []) if outcome else []
+                selector_used = outcome.get("selector_used") if outcome else None
 
             # Take screenshot after step
             screenshot_path = await self._take_screenshot(run_id, step.index)
@@ -476,7 +480,7 @@ class CDPRunner(BaseRunner):
                 selector_used=selector_used,
                 screenshot_path=screenshot_path,
                 duration_ms=duration_ms,
-                heal_attempts=[HealAttempt(**ha.__dict__) for ha in heal_attempts] if heal_attempts else [],
+                heal_attempts=list(heal_attempts),
             )
 
         except Exception as e:
@@ -501,9 +505,66 @@ class CDPRunner(BaseRunner):
     async def _execute_goto(self, step: PlaywrightStep):
         """Execute navigation."""
         assert self._page and step.url
+        previous_document = await self._main_frame_document()
         await self._page.goto(step.url)
-        # Wait for page to settle
-        await asyncio.sleep(1)
+        await self._wait_for_load_state(timeout=step.timeout, previous_document=previous_document)
+
+    async def _main_frame_document(self) -> tuple[str, str] | None:
+        """Return the main frame's (loaderId, url), or None if the frame tree can't be read."""
+        assert self._page and self._session_id
+        try:
+            frame_tree = await self._page._client.send.Page.getFrameTree(session_id=self._session_id)
+        except Exception as e:
+            logger.debug(f"Frame tree read failed: {e}")
+            return None
+        frame = frame_tree['frameTree']['frame']
+        return frame.get('loaderId', ''), frame.get('url', '')
+
+    async def _wait_for_load_state(
+        self,
+        timeout: int = 2000,
+        previous_document: tuple[str, str] | None = None,
+    ) -> None:
+        """Wait for the load event (readyState complete), then let the page settle.
+
+        Page.goto only sends Page.navigate, so right afterwards readyState may still describe
+        the old document. When previous_document is given, 'complete' only counts once the
+        main frame's loader or URL has changed (or _NAVIGATION_COMMIT_GRACE_S has passed).
+
+        Args:
+            timeout: Maximum time to wait in milliseconds
+            previous_document: Main frame (loaderId, url) read before navigating
+        """
+        assert self._page and self._session_id
+        cdp_client = self._page._client
+        started = time.monotonic()
+        deadline = started + ms_to_seconds(timeout)
+        committed = previous_document is None
+
+        while time.monotonic() < deadline:
+            if not committed:
+                current = await self._main_frame_document()
+                committed = (
+                    (current is not None and current != previous_document)
+                    or time.monotonic() - started >= _NAVIGATION_COMMIT_GRACE_S
+                )
+                if not committed:
+                    await asyncio.sleep(0.05)
+                    continue
+            try:
+                eval_result = await cdp_client.send.Runtime.evaluate(
+                    params={'expression': 'document.readyState', 'returnByValue': True},
+                    session_id=self._session_id,
+                )
+                if eval_result.get('result', {}).get('value') == 'complete':
+                    await asyncio.sleep(_POST_LOAD_SETTLE_S)
+                    return
+            except Exception as e:
+                # Context may be torn down mid-navigation; keep polling
+                logger.debug(f"readyState check failed: {e}")
+            await asyncio.sleep(0.05)
+
+        logger.debug(f"Page did not finish loading within {timeout}ms")
 
     async def _execute_click(self, step: PlaywrightStep) -> CDPElementLocator:
         """Execute click with self-healing."""
@@ -548,13 +609,9 @@ class CDPRunner(BaseRunner):
         if object_id:
             await cdp_client.send.Runtime.callFunctionOn(
                 params={
-                    'functionDeclaration': f'''
-                        function() {{
-                            this.value = "{step.value}";
-                            this.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                        }}
-                    ''',
+                    'functionDeclaration': _SET_SELECT_VALUE_JS,
                     'objectId': object_id,
+                    'arguments': [{'value': step.value}],
                 },
                 session_id=self._session_id,
             )
@@ -590,13 +647,52 @@ class CDPRunner(BaseRunner):
         else:
             delta_y = amount
 
+        start_y = await self._scroll_y()
         mouse = Mouse(self._session, self._session_id)
         await mouse.scroll(delta_y=delta_y)
-        await asyncio.sleep(0.3)  # Wait for scroll to complete
+
+        if start_y is None:
+            await asyncio.sleep(0.3)
+            return
+
+        # Wait until the (possibly smooth) scroll lands, hits the top/bottom of the page, or
+        # leaves scrollY unchanged for two polls (an inner scroll container never moves it);
+        # bounded like the Playwright runner's wait.
+        landed = _SCROLL_LANDED_JS % {'before': float(start_y), 'dy': float(delta_y)}
+        deadline = time.monotonic() + 1.0
+        last_y, still = start_y, 0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            state = await self._evaluate_value(landed)
+            if state is True:
+                return
+            if state is None:
+                continue
+            still = still + 1 if state == last_y else 0
+            if still >= 2:
+                return
+            last_y = state
+
+    async def _scroll_y(self) -> float | None:
+        """Read window.scrollY via CDP, or None if it can't be evaluated."""
+        return await self._evaluate_value('window.scrollY')
+
+    async def _evaluate_value(self, expression: str) -> Any:
+        """Evaluate an expression via CDP and return its value, or None if it fails."""
+        assert self._page and self._session_id
+        try:
+            eval_result = await self._page._client.send.Runtime.evaluate(
+                params={'expression': expression, 'returnByValue': True},
+                session_id=self._session_id,
+            )
+        except Exception as e:
+            logger.debug(f"Evaluating {expression!r} failed: {e}")
+            return None
+        return eval_result.get('result', {}).get('value')
 
     async def _execute_wait(self, step: PlaywrightStep):
         """Execute wait."""
-        timeout_seconds = step.timeout / 1000 if step.timeout else 1
+        timeout_seconds = ms_to_seconds(step.timeout)
         await asyncio.sleep(timeout_seconds)
 
     async def _execute_hover(self, step: PlaywrightStep) -> CDPElementLocator:
@@ -654,10 +750,9 @@ class CDPRunner(BaseRunner):
                         result["error"] = f"Could not find element containing text: {expected}"
                 else:
                     # Look for text anywhere on page
-                    escaped_expected = expected.replace('"', '\\"')
                     eval_result = await cdp_client.send.Runtime.evaluate(
                         params={
-                            'expression': f'document.body.innerText.includes("{escaped_expected}")',
+                            'expression': f'document.body.innerText.includes({_quote(expected)})',
                             'returnByValue': True,
                         },
                         session_id=self._session_id,
@@ -750,13 +845,12 @@ class CDPRunner(BaseRunner):
                 if selector.startswith("xpath="):
                     # XPath count
                     xpath = selector[6:]
-                    escaped_xpath = xpath.replace('"', '\\"')
                     eval_result = await cdp_client.send.Runtime.evaluate(
                         params={
                             'expression': f'''
                                 (function() {{
                                     const result = document.evaluate(
-                                        "{escaped_xpath}",
+                                        {_quote(xpath)},
                                         document,
                                         null,
                                         XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,
@@ -788,20 +882,44 @@ class CDPRunner(BaseRunner):
 
         return result
 
+    async def _execute_assert(self, step: PlaywrightStep) -> dict[str, Any]:
+        """Execute an assertion step, raising if it does not hold."""
+        assertion_result = await self._execute_assertion(step)
+        if not assertion_result["success"]:
+            raise AssertionError(assertion_result.get("error", "Assertion failed"))
+        return assertion_result
+
+    # Action name -> (handler, returns a CDPElementLocator). Other handlers return
+    # None or a dict with "heal_attempts"/"selector_used".
+    _ACTIONS = {
+        "goto": (_execute_goto, False),
+        "click": (_execute_click, True),
+        "fill": (_execute_fill, True),
+        "select": (_execute_select, True),
+        "press": (_execute_press, False),
+        "scroll": (_execute_scroll, False),
+        "wait": (_execute_wait, False),
+        "hover": (_execute_hover, True),
+        "assert": (_execute_assert, False),
+    }
+
     async def _take_screenshot(self, run_id: str, step_index: int, is_error: bool = False) -> str:
         """Take a screenshot and return the path relative to base screenshots dir."""
         assert self._page
 
-        suffix = "_error" if is_error else ""
-        filename = f"{run_id}_step_{step_index:03d}{suffix}.png"
+        if is_error:
+            filename = f"{run_id}_step_{step_index:03d}_error.png"
+            options: dict[str, Any] = {'format': 'png'}
+        else:
+            filename = f"{run_id}_step_{step_index:03d}.jpg"
+            options = {'format': 'jpeg', 'quality': STEP_SCREENSHOT_QUALITY}
         filepath = self.screenshot_dir / filename
 
         # Get base64 screenshot from CDP
-        base64_data = await self._page.screenshot(format='png')
+        base64_data = await self._page.screenshot(**options)
 
-        # Save to file
-        with open(filepath, 'wb') as f:
-            f.write(base64.b64decode(base64_data))
+        # Decode now (cheap), write the file off the step path
+        self._write_screenshot_later(filepath, base64.b64decode(base64_data))
 
         # Return path relative to base screenshots directory
         return f"runs/{filename}"
@@ -12,12 +12,13 @@ import asyncio
 import logging
 import re
 import time
-from datetime import datetime
-from typing import Any
+from functools import lru_cache, partial
+from operator import attrgetter
+from typing import Any, Awaitable, Callable
 
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Locator, TimeoutError as PlaywrightTimeout, expect
 
-from app.services.script_recorder import PlaywrightStep, SelectorSet, ElementContext, AssertionConfig
+from app.services.script_recorder import PlaywrightStep, SelectorSet, ElementContext, AssertionConfig, parse_steps
 from app.services.base_runner import (
     BaseRunner,
     HealAttempt,
@@ -25,107 +26,340 @@ from app.services.base_runner import (
     RunResult,
     StepStartCallback,
     StepCompleteCallback,
+    css_quote,
+    ms_to_seconds,
+    STEP_SCREENSHOT_QUALITY,
 )
 
 logger = logging.getLogger(__name__)
 
+# How long a matched fallback waits for more preferred selectors still being probed
+_PREFERENCE_GRACE_S = 0.2
+
+# Visibility wait for each one-shot Playwright-engine check of a fuzzy selector
+_FUZZY_CHECK_TIMEOUT_MS = 500
+
+# Upper bound on fallback probes in flight at once, so selector-heavy steps can't flood the driver
+_MAX_CONCURRENT_PROBES = 8
+
+# Resolves once a wheel scroll of dy from scrollY=before has landed, reached the page edge,
+# or left scrollY unchanged for two polls in a row; capped at one second.
+_SCROLL_SETTLE_JS = """async ([before, dy]) => {
+	const edge = () => document.documentElement.scrollHeight - window.innerHeight - 1;
+	const end = performance.now() + 1000;
+	let last = before, still = 0;
+	while (performance.now() < end) {
+		await new Promise((resolve) => setTimeout(resolve, 50));
+		const y = window.scrollY;
+		if (Math.abs(y - before - dy) < 2 || (dy < 0 && y <= 0) || (dy > 0 && y >= edge())) return;
+		still = y === last ? still + 1 : 0;
+		if (still >= 2) return;
+		last = y;
+	}
+}"""
+
+# Marker attribute used to hand an element found by in-page fuzzy search back to Playwright
+_HEALED_ATTR = "data-qa-healed"
+
+# Checks every fuzzy candidate against the live DOM in a single evaluation.
+# Each candidate is [kind, value, extra]; returns [index, absolute XPath] of the first match, or null.
+# The XPath names the element that actually matched, so it can be remembered and re-probed exactly.
+_FUZZY_PROBE_JS = """([cands, attr]) => {
+	const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+	const xpathOf = (el) => {
+		const parts = [];
+		for (; el && el.nodeType === 1; el = el.parentNode) {
+			let i = 1;
+			for (let s = el.previousElementSibling; s; s = s.previousElementSibling) if (s.nodeName === el.nodeName) i++;
+			parts.unshift(`${el.nodeName.toLowerCase()}[${i}]`);
+		}
+		return "/" + parts.join("/");
+	};
+	const text = (el) => (el.textContent || "").trim();
+	const smallest = (el, match) => {
+		let child = [...el.children].find(match);
+		while (child) { el = child; child = [...el.children].find(match); }
+		return el;
+	};
+	for (const el of document.querySelectorAll(`[${attr}]`)) el.removeAttribute(attr);
+	for (let i = 0; i < cands.length; i++) {
+		const [kind, value, extra] = cands[i];
+		let found = null;
+		if (kind === "text") {
+			const match = (e) => text(e) === value;
+			const el = [...document.body.querySelectorAll("*")].find((e) => match(e) && visible(e));
+			if (el) found = smallest(el, match);
+		} else if (kind === "has-text") {
+			// Descend to the innermost match so an outer wrapper containing the text isn't picked
+			for (const e of document.querySelectorAll(extra)) {
+				if ((!found || found.contains(e)) && text(e).includes(value) && visible(e)) found = e;
+			}
+		} else if (kind === "attr") {
+			found = [...document.querySelectorAll(`[${extra}="${CSS.escape(value)}"]`)].find(visible);
+		} else if (kind === "role") {
+			found = [...document.querySelectorAll(`[role="${CSS.escape(value)}"]`)].find(
+				(e) => visible(e) && (!extra || e.getAttribute("aria-label") === extra || text(e) === extra)
+			);
+		}
+		if (found) {
+			found.setAttribute(attr, "1");
+			return [i, xpathOf(found)];
+		}
+	}
+	return null;
+}"""
+
+
+# Fuzzy healing rules, in order of preference: (probe kind, value getter, extra getter, selector template).
+# Templates are formatted with {0}=raw value, {1}=CSS-quoted value, {2}=element context, {3}=quoted accessible name.
+_FUZZY_RULES = (
+	("text", attrgetter("text_content"), lambda c: None, "text={0}"),
+	("has-text", attrgetter("text_content"), lambda c: c.tag_name or "*", "{2.tag_name}:has-text({1})"),
+	("attr", attrgetter("aria_label"), lambda c: "aria-label", "[aria-label={1}]"),
+	("attr", attrgetter("placeholder"), lambda c: "placeholder", "[placeholder={1}]"),
+	("role", lambda c: c.role if c.text_content else None, attrgetter("text_content"), "role={0}[name={3}]"),
+	("role", lambda c: None if c.text_content else c.role, lambda c: None, "role={0}"),
+)
+
+
+def _build_fuzzy_candidates(ctx: ElementContext) -> tuple[list[str], list[list[str | None]]]:
+	"""Build fuzzy selector strings and their in-page probe equivalents (same order).
+	
+	The result is memoized on the context, which does not change during a run.
+	"""
+	if ctx._fuzzy_cached is None:
+		ctx._fuzzy_cached = _compute_fuzzy_candidates(ctx)
+	return ctx._fuzzy_cached
+
+
+def _compute_fuzzy_candidates(ctx: ElementContext) -> tuple[list[str], list[list[str | None]]]:
+	selectors: list[str] = []
+	candidates: list[list[str | None]] = []
+	for kind, get_value, get_extra, template in _FUZZY_RULES:
+		value = get_value(ctx)
+		if not value:
+			continue
+		# Role names are whitespace-normalized by Playwright, whose role attribute parser has no hex escapes
+		name = " ".join((ctx.text_content or "").split())
+		selectors.append(template.format(value, css_quote(value), ctx, css_quote(name)))
+		candidates.append([kind, value, get_extra(ctx)])
+	return selectors, candidates
+
+
+@lru_cache(maxsize=256)
+def _compile_url_contains(expected: str) -> re.Pattern:
+	"""Compile (once per distinct value) a regex matching URLs that contain `expected`."""
+	return re.compile(re.escape(expected))
+
 
 class SelfHealingLocator:
 	"""A locator that tries multiple selectors until one works."""
 	
-	def __init__(self, page: Page, selectors: SelectorSet, element_context: ElementContext | None = None):
+	def __init__(
+		self,
+		page: Page,
+		selectors: SelectorSet,
+		element_context: ElementContext | None = None,
+		healed_memo: dict[tuple[str, ...], str] | None = None,
+	):
 		self.page = page
 		self.selectors = selectors
 		self.element_context = element_context
+		# Shared across a run: selector list -> fallback that healed it last time
+		self.healed_memo = healed_memo
 		self.heal_attempts: list[HealAttempt] = []
 		self.successful_selector: str | None = None
+		self._was_healed = False
 	
 	async def locate(self, timeout: int = 5000) -> Locator | None:
-		"""Try to locate the element using fallback selectors."""
+		"""Try to locate the element using fallback selectors.
+		
+		A selector that already healed the same selector list earlier in the run (a fallback
+		or a fuzzy match) is tried first on its own. Otherwise all selectors are probed concurrently: the lowest-index
+		(most preferred) match wins, and once any selector matches, more preferred probes
+		still in flight get a short grace period before being cancelled.
+		"""
 		all_selectors = self.selectors.all_selectors()
 		
-		for selector in all_selectors:
+		remembered = self.healed_memo.get(all_selectors) if self.healed_memo is not None else None
+		if remembered is not None:
 			try:
-				locator = self.page.locator(selector)
-				await locator.wait_for(state="visible", timeout=timeout)
-				count = await locator.count()
-				if count > 0:
-					self.successful_selector = selector
-					self.heal_attempts.append(HealAttempt(selector=selector, success=True))
-					return locator
-			except PlaywrightTimeout:
-				self.heal_attempts.append(HealAttempt(
-					selector=selector,
-					success=False,
-					error="Timeout waiting for element"
-				))
+				locator = await self._probe(remembered, timeout, full_wait=False)
 			except Exception as e:
-				self.heal_attempts.append(HealAttempt(
-					selector=selector,
-					success=False,
-					error=str(e)
-				))
-		
-		# Try fuzzy matching if element context is available
-		if self.element_context:
-			fuzzy_locator = await self._try_fuzzy_match(timeout)
-			if fuzzy_locator:
+				self._record_failure(remembered, e)
+			else:
+				self.successful_selector = remembered if remembered in all_selectors else f"[HEALED] {remembered}"
+				self._was_healed = True
+				self.heal_attempts.append(HealAttempt(selector=remembered, success=True))
+				return locator
+		
+		limit = asyncio.Semaphore(_MAX_CONCURRENT_PROBES)
+		deadline = asyncio.get_running_loop().time() + timeout / 1000
+		tasks = {
+			asyncio.create_task(
+				self._probe(selector, timeout, full_wait=True) if index == 0
+				else self._probe_limited(limit, selector, deadline)
+			): index
+			for index, selector in enumerate(all_selectors)
+		}
+		outcomes: dict[int, Locator | BaseException] = {}
+		pending = set(tasks)
+		found: int | None = None
+		
+		try:
+			while pending and found is None:
+				done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+				found = self._collect(tasks, done, outcomes)
+			
+			preferred = {task for task in pending if tasks[task] < (found or 0)}
+			if preferred:
+				done, _ = await asyncio.wait(preferred, timeout=_PREFERENCE_GRACE_S)
+				pending -= done
+				found = self._collect(tasks, done, outcomes)
+		finally:
+			for task in pending:
+				task.cancel()
+			await asyncio.gather(*pending, return_exceptions=True)
+		
+		# Record attempts in preference order, up to and including the winner; higher-priority
+		# probes cancelled after the grace period count as failures so healing stays visible
+		for index in range(len(all_selectors) if found is None else found + 1):
+			selector = all_selectors[index]
+			outcome = outcomes.get(index)
+			if outcome is None:
+				self.heal_attempts.append(HealAttempt.failure(selector, "Not visible before a fallback matched"))
+			elif isinstance(outcome, BaseException):
+				self._record_failure(selector, outcome)
+			elif index == found:
+				self.successful_selector = selector
+				self._was_healed = index != 0
+				self.heal_attempts.append(HealAttempt(selector=selector, success=True))
+		
+		if found is not None:
+			self._remember(all_selectors, all_selectors[found] if found else None)
+			return outcomes[found]
+		
+		# Try fuzzy matching if element context has anything to match on
+		if self.element_context and self.element_context.has_fuzzy_hints():
+			fuzzy_match = await self._try_fuzzy_match()
+			if fuzzy_match:
+				# Remembering the fuzzy winner spares the next identical step the primary's full timeout
+				fuzzy_locator, matched_selector = fuzzy_match
+				self._remember(all_selectors, matched_selector)
 				return fuzzy_locator
 		
+		self._remember(all_selectors, None)
 		return None
 	
-	async def _try_fuzzy_match(self, timeout: int) -> Locator | None:
-		"""Try to find element using fuzzy matching based on context."""
+	def _remember(self, all_selectors: tuple[str, ...], healed_with: str | None) -> None:
+		"""Record (or forget, if None) the selector that healed this selector list."""
+		if self.healed_memo is None:
+			return
+		if healed_with is None:
+			self.healed_memo.pop(all_selectors, None)
+		else:
+			self.healed_memo[all_selectors] = healed_with
+	
+	async def _try_fuzzy_match(self) -> tuple[Locator, str] | None:
+		"""Try to find element using fuzzy matching based on context.
+		
+		Returns the locator and the selector that actually matched it (to remember for the
+		next identical step), or None.
+		"""
 		ctx = self.element_context
 		if not ctx:
 			return None
 		
-		fuzzy_selectors = []
-		
-		# Try by text content
-		if ctx.text_content:
-			fuzzy_selectors.append(f"text={ctx.text_content}")
-			fuzzy_selectors.append(f"{ctx.tag_name}:has-text('{ctx.text_content}')")
-		
-		# Try by aria-label
-		if ctx.aria_label:
-			fuzzy_selectors.append(f"[aria-label='{ctx.aria_label}']")
-		
-		# Try by placeholder
-		if ctx.placeholder:
-			fuzzy_selectors.append(f"[placeholder='{ctx.placeholder}']")
-		
-		# Try by role
-		if ctx.role:
-			if ctx.text_content:
-				fuzzy_selectors.append(f"role={ctx.role}[name='{ctx.text_content}']")
-			else:
-				fuzzy_selectors.append(f"role={ctx.role}")
+		fuzzy_selectors, candidates = _build_fuzzy_candidates(ctx)
 		
+		if not fuzzy_selectors:
+			return None
+
+		# Fast path: check all candidates synchronously in one round-trip
+		try:
+			match = await self.page.evaluate(_FUZZY_PROBE_JS, [candidates, _HEALED_ATTR])
+		except Exception as e:
+			logger.debug("In-page fuzzy probe failed: %s", e)
+			match = None
+
+		if match:
+			index, xpath = match
+			self._healed_by(fuzzy_selectors[index])
+			return self.page.locator(f"[{_HEALED_ATTR}='1']"), f"xpath={xpath}"
+
+		# The in-page probe is stricter than Playwright's engines (exact, case-sensitive text,
+		# no shadow DOM), so give each selector one engine check; the primary already waited
+		# the full timeout, so there is nothing late to poll for.
 		for selector in fuzzy_selectors:
 			try:
-				locator = self.page.locator(selector)
-				await locator.wait_for(state="visible", timeout=timeout // 2)
-				count = await locator.count()
-				if count > 0:
-					self.successful_selector = f"[HEALED] {selector}"
-					self.heal_attempts.append(HealAttempt(selector=selector, success=True))
-					return locator
+				locator = await self._probe(selector, _FUZZY_CHECK_TIMEOUT_MS, full_wait=False)
 			except Exception as e:
-				self.heal_attempts.append(HealAttempt(
-					selector=selector,
-					success=False,
-					error=str(e)
-				))
+				self._record_failure(selector, e)
+			else:
+				self._healed_by(selector)
+				return locator, selector
 		
 		return None
 	
+	def _healed_by(self, fuzzy_selector: str) -> None:
+		"""Record a successful fuzzy heal."""
+		self.successful_selector = f"[HEALED] {fuzzy_selector}"
+		self._was_healed = True
+		self.heal_attempts.append(HealAttempt(selector=fuzzy_selector, success=True))
+	
+	async def _probe(self, selector: str, timeout: int, full_wait: bool) -> Locator:
+		"""Return a visible locator for the selector, raising if it can't be found.
+		
+		Without full_wait, a selector that matches nothing right now fails after a single
+		count() round-trip, and visibility is only awaited briefly.
+		"""
+		locator = self.page.locator(selector)
+		if full_wait:
+			await locator.wait_for(state="visible", timeout=timeout)
+		else:
+			if await locator.count() == 0:
+				raise LookupError("No matching element")
+			await locator.wait_for(state="visible", timeout=min(timeout, 500))
+		# wait_for() returning already proves a visible match exists
+		return locator
+	
+	async def _probe_limited(self, limit: asyncio.Semaphore, selector: str, deadline: float) -> Locator:
+		"""Wait for a fallback selector once a concurrency slot is free, until the shared deadline.
+		
+		Fallbacks wait for late-rendering elements just like the primary; the deadline keeps
+		queued probes from pushing the step past a single timeout.
+		"""
+		async with limit:
+			remaining_ms = int((deadline - asyncio.get_running_loop().time()) * 1000)
+			if remaining_ms <= 0:
+				raise LookupError("No time left to probe")
+			return await self._probe(selector, remaining_ms, full_wait=True)
+	
+	@staticmethod
+	def _collect(
+		tasks: dict[asyncio.Task, int],
+		done: set[asyncio.Task],
+		outcomes: dict[int, Locator | BaseException],
+	) -> int | None:
+		"""Store finished probe results and return the best successful index so far."""
+		for task in done:
+			outcomes[tasks[task]] = task.exception() or task.result()
+		return min((i for i, o in outcomes.items() if not isinstance(o, BaseException)), default=None)
+	
+	def _record_failure(self, selector: str, error: BaseException) -> None:
+		"""Record a failed selector attempt."""
+		self.heal_attempts.append(HealAttempt.failure(
+			selector,
+			"Timeout waiting for element" if isinstance(error, PlaywrightTimeout) else error
+		))
+	
 	def was_healed(self) -> bool:
 		"""Check if the locator required healing (used a fallback selector)."""
-		if not self.successful_selector:
-			return False
-		primary = self.selectors.primary
-		return self.successful_selector != primary
+		return self._was_healed
+	
+	def result(self) -> tuple[str, list[HealAttempt], str | None]:
+		"""Return (status, heal_attempts, selector_used) for the step result."""
+		return ("healed" if self._was_healed else "passed", self.heal_attempts, self.successful_selector)
 
 
 class PlaywrightRunner(BaseRunner):
@@ -137,13 +371,19 @@ class PlaywrightRunner(BaseRunner):
 		screenshot_dir: str = "data/screenshots/runs",
 		on_step_start: StepStartCallback | None = None,
 		on_step_complete: StepCompleteCallback | None = None,
+		default_timeout_ms: int = 30000,
+		keep_step_results: bool = True,
 	):
-		super().__init__(headless, screenshot_dir, on_step_start, on_step_complete)
+		super().__init__(headless, screenshot_dir, on_step_start, on_step_complete, keep_step_results)
 
+		# Applied to the context once; per-call timeouts are only sent when a step overrides it
+		self._default_timeout_ms = default_timeout_ms
 		self._playwright = None
 		self._browser: Browser | None = None
 		self._context: BrowserContext | None = None
 		self._page: Page | None = None
+		# Fallback selectors that healed a step, reused when the same selectors recur
+		self._healed_selectors: dict[tuple[str, ...], str] = {}
 
 	async def __aenter__(self) -> "PlaywrightRunner":
 		await self._setup()
@@ -160,6 +400,8 @@ class PlaywrightRunner(BaseRunner):
 		self._context = await self._browser.new_context(
 			viewport={"width": 1280, "height": 720}
 		)
+		self._context.set_default_timeout(self._default_timeout_ms)
+		self._context.set_default_navigation_timeout(self._default_timeout_ms)
 		self._page = await self._context.new_page()
 		logger.info("Browser initialized successfully")
 	
@@ -175,30 +417,49 @@ class PlaywrightRunner(BaseRunner):
 				await self._playwright.stop()
 			logger.info("Browser cleanup complete")
 		except Exception as e:
-			logger.error(f"Error during browser cleanup: {e}")
+			logger.error("Error during browser cleanup: %s", e)
 	
 	async def run(self, steps: list[PlaywrightStep], run_id: str) -> RunResult:
 		"""Execute a list of steps and return results."""
-		logger.info(f"Starting run {run_id} with {len(steps)} steps")
+		logger.info("Starting run %s with %s steps", run_id, len(steps))
 		result = RunResult(
 			status="running",
 			total_steps=len(steps),
 			passed_steps=0,
 			failed_steps=0,
 			healed_steps=0,
-			started_at=datetime.utcnow(),
+			started_at_ns=time.time_ns(),
 		)
 		
+		# Callbacks are drained by a background task so slow sinks (DB, WebSocket)
+		# overlap with the next browser action; a single FIFO keeps them in order.
+		callback_queue: asyncio.Queue | None = None
+		callback_task: asyncio.Task | None = None
+		self._callback_error = None
+		if self.on_step_start or self.on_step_complete:
+			callback_queue = asyncio.Queue()
+			callback_task = asyncio.create_task(self._drain_callbacks(callback_queue))
+		
 		try:
-			for step in steps:
-				logger.debug(f"Executing step {step.index}: {step.action}")
+			# Resolve every step's handler up front so the loop only awaits
+			plans = [self._compile(step) for step in steps]
+			
+			debug = logger.isEnabledFor(logging.DEBUG)
+			
+			for step, plan in zip(steps, plans):
+				# A failed step callback (e.g. the DB commit of the previous step) stops the run
+				self._raise_callback_error()
+				if debug:
+					logger.debug("Executing step %s: %s", step.index, step.action)
 				if self.on_step_start:
-					await self._call_callback(self.on_step_start, step.index, step)
+					callback_queue.put_nowait((self.on_step_start, step.index, step))
 				
-				step_result = await self._execute_step(step, run_id)
-				result.step_results.append(step_result)
+				step_result = await self._execute_step(step, run_id, plan)
+				if self.keep_step_results:
+					result.step_results.append(step_result)
 				
-				logger.debug(f"Step {step.index} result: {step_result.status}")
+				if debug:
+					logger.debug("Step %s result: %s", step.index, step_result.status)
 				
 				if step_result.status == "passed":
 					result.passed_steps += 1
@@ -207,11 +468,15 @@ class PlaywrightRunner(BaseRunner):
 				elif step_result.status == "failed":
 					result.failed_steps += 1
 					result.error_message = step_result.error_message
-					logger.warning(f"Step {step.index} failed: {step_result.error_message}")
+					logger.warning("Step %s failed: %s", step.index, step_result.error_message)
 					break
 				
 				if self.on_step_complete:
-					await self._call_callback(self.on_step_complete, step.index, step_result)
+					callback_queue.put_nowait((self.on_step_complete, step.index, step_result))
+			
+			if callback_queue is not None:
+				await callback_queue.join()
+				self._raise_callback_error()
 			
 			# Determine final status
 			if result.failed_steps > 0:
@@ -221,85 +486,59 @@ class PlaywrightRunner(BaseRunner):
 			else:
 				result.status = "passed"
 			
-			logger.info(f"Run {run_id} completed with status: {result.status}")
+			logger.info("Run %s completed with status: %s", run_id, result.status)
 				
 		except Exception as e:
 			result.status = "failed"
 			result.error_message = str(e)
-			logger.exception(f"Run {run_id} failed with error: {e}")
+			logger.exception("Run %s failed with error: %s", run_id, e)
 		finally:
-			result.completed_at = datetime.utcnow()
+			if callback_queue is not None and callback_task is not None:
+				await callback_queue.join()
+				callback_task.cancel()
+			await self._flush_screenshots()
+			result.completed_at_ns = time.time_ns()
 		
 		return result
 	
-	async def _execute_step(self, step: PlaywrightStep, run_id: str) -> StepResult:
-		"""Execute a single step."""
-		start_time = time.time()
+	def _compile(self, step: PlaywrightStep) -> tuple[Callable[[], Awaitable[Any]] | None, bool]:
+		"""Bind a step to its action handler ahead of execution.
+		
+		Returns (execute, returns_healer); execute is None for unknown actions.
+		"""
+		action = self._ACTIONS.get(step.action)
+		if action is None:
+			return None, False
+		handler, returns_healer = action
+		return partial(handler, self, step), returns_healer
+	
+	async def _execute_step(
+		self,
+		step: PlaywrightStep,
+		run_id: str,
+		plan: tuple[Callable[[], Awaitable[Any]] | None, bool] | None = None,
+	) -> StepResult:
+		"""Execute a single step, using a precompiled plan when given."""
+		start_time = time.perf_counter_ns()
 		
 		try:
-			if step.action == "goto":
-				await self._execute_goto(step)
-				status = "passed"
-				heal_attempts = []
-				selector_used = None
-				
-			elif step.action == "click":
-				locator_result = await self._execute_click(step)
-				status = "healed" if locator_result.was_healed() else "passed"
-				heal_attempts = locator_result.heal_attempts
-				selector_used = locator_result.successful_selector
-				
-			elif step.action == "fill":
-				locator_result = await self._execute_fill(step)
-				status = "healed" if locator_result.was_healed() else "passed"
-				heal_attempts = locator_result.heal_attempts
-				selector_used = locator_result.successful_selector
-				
-			elif step.action == "select":
-				locator_result = await self._execute_select(step)
-				status = "healed" if locator_result.was_healed() else "passed"
-				heal_attempts = locator_result.heal_attempts
-				selector_used = locator_result.successful_selector
-				
-			elif step.action == "press":
-				await self._execute_press(step)
-				status = "passed"
-				heal_attempts = []
-				selector_used = None
-				
-			elif step.action == "scroll":
-				await self._execute_scroll(step)
-				status = "passed"
-				heal_attempts = []
-				selector_used = None
-				
-			elif step.action == "wait":
-				await self._execute_wait(step)
-				status = "passed"
-				heal_attempts = []
-				selector_used = None
-				
-			elif step.action == "hover":
-				locator_result = await self._execute_hover(step)
-				status = "healed" if locator_result.was_healed() else "passed"
-				heal_attempts = locator_result.heal_attempts
-				selector_used = locator_result.successful_selector
-				
-			elif step.action == "assert":
-				assertion_result = await self._execute_assertion(step)
-				status = "passed" if assertion_result["success"] else "failed"
-				heal_attempts = assertion_result.get("heal_attempts", [])
-				selector_used = assertion_result.get("selector_used")
-				if not assertion_result["success"]:
-					raise AssertionError(assertion_result.get("error", "Assertion failed"))
-				
-			else:
+			execute, returns_healer = plan or self._compile(step)
+			if execute is None:
 				raise ValueError(f"Unknown action: {step.action}")
 			
+			outcome = await execute()
+			
+			if returns_healer:
+				status, heal_attempts, selector_used = outcome.result()
+			else:
+				status = "passed"
+				heal_attempts = outcome.get("heal_attempts", []) if outcome else []
+				selector_used = outcome.get("selector_used") if outcome else None
+			
 			# Take screenshot after step
 			screenshot_path = await self._take_screenshot(run_id, step.index)
 			
-			duration_ms = int((time.time() - start_time) * 1000)
+			duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
 			
 			return StepResult(
 				step_index=step.index,
@@ -308,18 +547,18 @@ class PlaywrightRunner(BaseRunner):
 				selector_used=selector_used,
 				screenshot_path=screenshot_path,
 				duration_ms=duration_ms,
-				heal_attempts=[HealAttempt(**ha.__dict__) for ha in heal_attempts] if heal_attempts else [],
+				heal_attempts=list(heal_attempts),
 			)
 			
 		except Exception as e:
-			duration_ms = int((time.time() - start_time) * 1000)
-			logger.error(f"Step {step.index} ({step.action}) failed: {e}")
+			duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+			logger.error("Step %s (%s) failed: %s", step.index, step.action, e)
 			
 			screenshot_path = None
 			try:
 				screenshot_path = await self._take_screenshot(run_id, step.index, is_error=True)
 			except Exception as screenshot_error:
-				logger.warning(f"Failed to take error screenshot: {screenshot_error}")
+				logger.warning("Failed to take error screenshot: %s", screenshot_error)
 			
 			return StepResult(
 				step_index=step.index,
@@ -330,49 +569,57 @@ class PlaywrightRunner(BaseRunner):
 				error_message=str(e),
 			)
 	
+	def _healer(self, step: PlaywrightStep) -> SelfHealingLocator:
+		"""Create a self-healing locator for the step's selectors."""
+		return SelfHealingLocator(self._page, step.selectors, step.element_context, self._healed_selectors)
+	
+	def _timeout(self, step: PlaywrightStep) -> int | None:
+		"""Per-call timeout for an action, or None to use the context default."""
+		return None if step.timeout == self._default_timeout_ms else step.timeout
+	
 	async def _execute_goto(self, step: PlaywrightStep):
 		"""Execute navigation."""
 		assert self._page and step.url
 		wait_until = step.wait_for or "domcontentloaded"
-		await self._page.goto(step.url, wait_until=wait_until, timeout=step.timeout)
+		await self._page.goto(step.url, wait_until=wait_until, timeout=self._timeout(step))
 	
 	async def _execute_click(self, step: PlaywrightStep) -> SelfHealingLocator:
 		"""Execute click with self-healing."""
 		assert self._page and step.selectors
 		
-		healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
+		healer = self._healer(step)
 		locator = await healer.locate(timeout=step.timeout)
 		
 		if not locator:
 			raise Exception(f"Could not find element to click. Tried selectors: {step.selectors.all_selectors()}")
 		
-		await locator.click(timeout=step.timeout)
+		await locator.click(timeout=self._timeout(step))
 		return healer
 	
 	async def _execute_fill(self, step: PlaywrightStep) -> SelfHealingLocator:
 		"""Execute fill with self-healing."""
 		assert self._page and step.selectors and step.value is not None
 		
-		healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
+		healer = self._healer(step)
 		locator = await healer.locate(timeout=step.timeout)
 		
 		if not locator:
 			raise Exception(f"Could not find element to fill. Tried selectors: {step.selectors.all_selectors()}")
 		
-		await locator.fill(step.value, timeout=step.timeout)
+		await locator.fill(step.value, timeout=self._timeout(step))
 		return healer
 	
 	async def _execute_select(self, step: PlaywrightStep) -> SelfHealingLocator:
 		"""Execute dropdown select with self-healing."""
 		assert self._page and step.selectors and step.value is not None
 		
-		healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
+		healer = self._healer(step)
 		locator = await healer.locate(timeout=step.timeout)
 		
 		if not locator:
 			raise Exception(f"Could not find dropdown. Tried selectors: {step.selectors.all_selectors()}")
 		
-		await locator.select_option(step.value, timeout=step.timeout)
+		await locator.select_option(step.value, timeout=self._timeout(step))
 		return healer
 	
 	async def _execute_press(self, step: PlaywrightStep):
@@ -380,7 +627,7 @@ class PlaywrightRunner(BaseRunner):
 		assert self._page and step.key
 		
 		if step.selectors:
-			healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
+			healer = self._healer(step)
 			locator = await healer.locate(timeout=step.timeout)
 			if locator:
 				await locator.press(step.key)
@@ -396,25 +643,39 @@ class PlaywrightRunner(BaseRunner):
 		if step.direction == "up":
 			amount = -amount
 		
+		try:
+			before = await self._page.evaluate("window.scrollY")
+		except Exception:
+			before = None
 		await self._page.mouse.wheel(0, amount)
-		await asyncio.sleep(0.3)  # Wait for scroll to complete
+		
+		if before is None:
+			await asyncio.sleep(0.3)
+			return
+		
+		# Wait until the scroll lands, hits the top/bottom of the page, or stops moving
+		# (an inner scroll container never moves window.scrollY)
+		try:
+			await self._page.evaluate(_SCROLL_SETTLE_JS, [before, amount])
+		except Exception:
+			await asyncio.sleep(0.05)
 	
 	async def _execute_wait(self, step: PlaywrightStep):
 		"""Execute wait."""
-		timeout_seconds = step.timeout / 1000 if step.timeout else 1
+		timeout_seconds = ms_to_seconds(step.timeout)
 		await asyncio.sleep(timeout_seconds)
 	
 	async def _execute_hover(self, step: PlaywrightStep) -> SelfHealingLocator:
 		"""Execute hover with self-healing."""
 		assert self._page and step.selectors
 		
-		healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
+		healer = self._healer(step)
 		locator = await healer.locate(timeout=step.timeout)
 		
 		if not locator:
 			raise Exception(f"Could not find element to hover. Tried selectors: {step.selectors.all_selectors()}")
 		
-		await locator.hover(timeout=step.timeout)
+		await locator.hover(timeout=self._timeout(step))
 		return healer
 	
 	async def _execute_assertion(self, step: PlaywrightStep) -> dict[str, Any]:
@@ -424,104 +685,147 @@ class PlaywrightRunner(BaseRunner):
 		assertion = step.assertion
 		result: dict[str, Any] = {"success": False, "heal_attempts": [], "selector_used": None}
 		
-		try:
-			if assertion.assertion_type == "text_visible":
-				# Check if text is visible on page
-				expected = assertion.expected_value or ""
-				
-				if step.selectors:
-					# Look for text within a specific element
-					healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
-					locator = await healer.locate(timeout=step.timeout)
-					result["heal_attempts"] = healer.heal_attempts
-					result["selector_used"] = healer.successful_selector
-					
-					if locator:
-						if assertion.partial_match:
-							await expect(locator).to_contain_text(expected, timeout=step.timeout)
-						else:
-							await expect(locator).to_have_text(expected, timeout=step.timeout)
-						result["success"] = True
-					else:
-						result["error"] = f"Could not find element containing text: {expected}"
-				else:
-					# Look for text anywhere on page
-					text_locator = self._page.get_by_text(expected, exact=not assertion.partial_match)
-					await expect(text_locator.first).to_be_visible(timeout=step.timeout)
-					result["success"] = True
-					result["selector_used"] = f"text={expected}"
-			
-			elif assertion.assertion_type == "element_visible":
-				assert step.selectors
-				healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
-				locator = await healer.locate(timeout=step.timeout)
-				result["heal_attempts"] = healer.heal_attempts
-				result["selector_used"] = healer.successful_selector
-				
-				if locator:
-					await expect(locator).to_be_visible(timeout=step.timeout)
-					result["success"] = True
-				else:
-					result["error"] = "Element not found"
-			
-			elif assertion.assertion_type == "url_contains":
-				expected = assertion.expected_value or ""
-				# Use regex pattern for url_contains since Playwright's to_have_url glob doesn't support substring matching well
-				pattern = re.compile(re.escape(expected))
-				await expect(self._page).to_have_url(pattern, timeout=step.timeout)
-				result["success"] = True
-				result["selector_used"] = f"url contains {expected}"
-			
-			elif assertion.assertion_type == "url_equals":
-				expected = assertion.expected_value or ""
-				await expect(self._page).to_have_url(expected, timeout=step.timeout)
-				result["success"] = True
-				result["selector_used"] = f"url equals {expected}"
-			
-			elif assertion.assertion_type == "value_equals":
-				assert step.selectors
-				expected = assertion.expected_value or ""
-				healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
-				locator = await healer.locate(timeout=step.timeout)
-				result["heal_attempts"] = healer.heal_attempts
-				result["selector_used"] = healer.successful_selector
-				
-				if locator:
-					await expect(locator).to_have_value(expected, timeout=step.timeout)
-					result["success"] = True
-				else:
-					result["error"] = "Input element not found"
-			
-			elif assertion.assertion_type == "element_count":
-				assert step.selectors and assertion.expected_count is not None
-				healer = SelfHealingLocator(self._page, step.selectors, step.element_context)
-				locator = await healer.locate(timeout=step.timeout)
-				result["heal_attempts"] = healer.heal_attempts
-				result["selector_used"] = healer.successful_selector
-				
-				if locator:
-					await expect(locator).to_have_count(assertion.expected_count, timeout=step.timeout)
-					result["success"] = True
-				else:
-					result["error"] = f"Expected {assertion.expected_count} elements but none found"
-			
-			else:
-				result["error"] = f"Unknown assertion type: {assertion.assertion_type}"
+		handler = self._ASSERTIONS.get(assertion.assertion_type)
+		if handler is None:
+			result["error"] = f"Unknown assertion type: {assertion.assertion_type}"
+			return result
 		
+		try:
+			await handler(self, step, assertion, result)
 		except Exception as e:
 			result["error"] = str(e)
 		
 		return result
 	
+	async def _locate_for_assertion(self, step: PlaywrightStep, result: dict[str, Any]) -> Locator | None:
+		"""Locate the assertion's element, recording healing details on the result."""
+		healer = self._healer(step)
+		locator = await healer.locate(timeout=step.timeout)
+		result["heal_attempts"] = healer.heal_attempts
+		result["selector_used"] = healer.successful_selector
+		return locator
+	
+	async def _assert_text_visible(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		"""Check if text is visible on page."""
+		expected = assertion.expected_value or ""
+		
+		if step.selectors:
+			# Look for text within a specific element
+			locator = await self._locate_for_assertion(step, result)
+			if locator:
+				if assertion.partial_match:
+					await expect(locator).to_contain_text(expected, timeout=step.timeout)
+				else:
+					await expect(locator).to_have_text(expected, timeout=step.timeout)
+				result["success"] = True
+			else:
+				result["error"] = f"Could not find element containing text: {expected}"
+		else:
+			# Look for text anywhere on page
+			text_locator = self._page.get_by_text(expected, exact=not assertion.partial_match)
+			await expect(text_locator.first).to_be_visible(timeout=step.timeout)
+			result["success"] = True
+			result["selector_used"] = f"text={expected}"
+	
+	async def _assert_element_visible(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		assert step.selectors
+		locator = await self._locate_for_assertion(step, result)
+		if locator:
+			await expect(locator).to_be_visible(timeout=step.timeout)
+			result["success"] = True
+		else:
+			result["error"] = "Element not found"
+	
+	async def _assert_url_contains(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		expected = assertion.expected_value or ""
+		# Plain substring check first; only fall back to expect()'s polling when it doesn't hold yet.
+		# Use regex pattern for url_contains since Playwright's to_have_url glob doesn't support substring matching well
+		if expected not in self._page.url:
+			await expect(self._page).to_have_url(_compile_url_contains(expected), timeout=step.timeout)
+		result["success"] = True
+		result["selector_used"] = f"url contains {expected}"
+	
+	async def _assert_url_equals(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		expected = assertion.expected_value or ""
+		# Skip expect()'s polling when the URL already matches
+		if self._page.url != expected:
+			await expect(self._page).to_have_url(expected, timeout=step.timeout)
+		result["success"] = True
+		result["selector_used"] = f"url equals {expected}"
+	
+	async def _assert_value_equals(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		assert step.selectors
+		expected = assertion.expected_value or ""
+		locator = await self._locate_for_assertion(step, result)
+		if locator:
+			if not await self._has_value(locator, expected):
+				await expect(locator).to_have_value(expected, timeout=step.timeout)
+			result["success"] = True
+		else:
+			result["error"] = "Input element not found"
+	
+	async def _assert_element_count(self, step: PlaywrightStep, assertion: AssertionConfig, result: dict[str, Any]) -> None:
+		assert step.selectors and assertion.expected_count is not None
+		locator = await self._locate_for_assertion(step, result)
+		if locator:
+			await expect(locator).to_have_count(assertion.expected_count, timeout=step.timeout)
+			result["success"] = True
+		else:
+			result["error"] = f"Expected {assertion.expected_count} elements but none found"
+	
+	# Assertion type -> handler; each fills in the shared result dict
+	_ASSERTIONS = {
+		"text_visible": _assert_text_visible,
+		"element_visible": _assert_element_visible,
+		"url_contains": _assert_url_contains,
+		"url_equals": _assert_url_equals,
+		"value_equals": _assert_value_equals,
+		"element_count": _assert_element_count,
+	}
+	
+	async def _execute_assert(self, step: PlaywrightStep) -> dict[str, Any]:
+		"""Execute an assertion step, raising if it does not hold."""
+		assertion_result = await self._execute_assertion(step)
+		if not assertion_result["success"]:
+			raise AssertionError(assertion_result.get("error", "Assertion failed"))
+		return assertion_result
+	
+	# Action name -> (handler, returns a SelfHealingLocator). Other handlers return
+	# None or a dict with "heal_attempts"/"selector_used".
+	_ACTIONS = {
+		"goto": (_execute_goto, False),
+		"click": (_execute_click, True),
+		"fill": (_execute_fill, True),
+		"select": (_execute_select, True),
+		"press": (_execute_press, False),
+		"scroll": (_execute_scroll, False),
+		"wait": (_execute_wait, False),
+		"hover": (_execute_hover, True),
+		"assert": (_execute_assert, False),
+	}
+	
+	async def _has_value(self, locator: Locator, expected: str) -> bool:
+		"""Single non-retrying read of an input's value; False if it can't be read."""
+		try:
+			return await locator.input_value(timeout=1000) == expected
+		except Exception:
+			return False
+	
 	async def _take_screenshot(self, run_id: str, step_index: int, is_error: bool = False) -> str:
 		"""Take a screenshot and return the path relative to base screenshots dir."""
 		assert self._page
 		
-		suffix = "_error" if is_error else ""
-		filename = f"{run_id}_step_{step_index:03d}{suffix}.png"
+		if is_error:
+			filename = f"{run_id}_step_{step_index:03d}_error.png"
+			options: dict[str, Any] = {}
+		else:
+			filename = f"{run_id}_step_{step_index:03d}.jpg"
+			options = {"type": "jpeg", "quality": STEP_SCREENSHOT_QUALITY}
 		filepath = self.screenshot_dir / filename
 		
-		await self._page.screenshot(path=str(filepath), full_page=False)
+		# Capture now so the image matches this step, but write the file off the step path
+		data = await self._page.screenshot(full_page=False, **options)
+		self._write_screenshot_later(filepath, data)
 		
 		# Return path relative to base screenshots directory (data/screenshots)
 		# The API expects paths like "runs/xxx.png" not "data/screenshots/runs/xxx.png"
@@ -535,14 +839,16 @@ async def run_script(
 	screenshot_dir: str = "data/screenshots/runs",
 	on_step_start: StepStartCallback | None = None,
 	on_step_complete: StepCompleteCallback | None = None,
+	default_timeout_ms: int = 30000,
 ) -> RunResult:
 	"""Convenience function to run a script from JSON."""
-	steps = [PlaywrightStep(**step) for step in steps_json]
+	steps = parse_steps(steps_json)
 	
 	async with PlaywrightRunner(
 		headless=headless,
 		screenshot_dir=screenshot_dir,
 		on_step_start=on_step_start,
 		on_step_complete=on_step_complete,
+		default_timeout_ms=default_timeout_ms,
 	) as runner:
 		return await runner.run(steps, run_id)
@@ -6,6 +6,7 @@ to PlaywrightSteps for later replay.
 """
 
 import logging
+import sys
 from typing import Any
 
 from browser_use.dom.views import EnhancedDOMTreeNode
@@ -14,52 +15,73 @@ from browser_use.dom.utils import generate_css_selector_for_element
 from app.services.script_recorder import (
 	ElementContext,
 	PlaywrightStep,
+	ScriptRecorder,
 	get_current_recorder,
 	AssertionConfig,
 )
 
 logger = logging.getLogger(__name__)
 
+def _intern(value: str | None) -> str | None:
+	"""Intern a small-vocabulary DOM string such as a tag name or role."""
+	return sys.intern(value) if value else value
+
 
 def extract_element_context(node: EnhancedDOMTreeNode) -> ElementContext:
 	"""Extract context from an EnhancedDOMTreeNode for self-healing."""
 	attrs = node.attributes or {}
+	get_attr = attrs.get
 	
-	text_content = None
-	if hasattr(node, 'text') and node.text:
-		text_content = node.text.strip()[:100]
+	text = getattr(node, 'text', None)
+	text_content = text.strip()[:100] if text else None
 	
-	classes = []
-	if 'class' in attrs:
-		classes = attrs['class'].split()[:5]
+	class_attr = get_attr('class')
+	classes = class_attr.split()[:5] if class_attr else []
 	
+	parent = node.parent_node
 	nearby_text = None
-	if node.parent_node and hasattr(node.parent_node, 'text') and node.parent_node.text:
-		nearby_text = node.parent_node.text.strip()[:50]
-	
 	parent_tag = None
-	if node.parent_node:
-		parent_tag = node.parent_node.node_name.lower()
+	if parent:
+		parent_text = getattr(parent, 'text', None)
+		if parent_text:
+			nearby_text = parent_text.strip()[:50]
+		parent_tag = sys.intern(parent.node_name.lower())
 	
 	return ElementContext(
-		tag_name=node.tag_name,
+		tag_name=_intern(node.tag_name),
 		text_content=text_content,
-		aria_label=attrs.get('aria-label'),
-		placeholder=attrs.get('placeholder'),
-		role=attrs.get('role'),
+		aria_label=get_attr('aria-label'),
+		placeholder=get_attr('placeholder'),
+		role=_intern(get_attr('role')),
 		classes=classes,
 		nearby_text=nearby_text,
 		parent_tag=parent_tag,
 	)
 
 
+def describe_node(recorder: ScriptRecorder, node: EnhancedDOMTreeNode) -> tuple[str | None, ElementContext]:
+	"""Return the CSS selector and ElementContext for a node, reusing the last result for the same node.
+	
+	The agent often records several steps against the same node object (click + verification,
+	repeated clicks within one DOM snapshot), and both derivations are pure functions of the node.
+	The cache lives on the recorder so it is released when recording stops.
+	"""
+	cached = recorder._last_described
+	if cached is not None and cached[0] is node:
+		return cached[1], cached[2]
+	css_selector = generate_css_selector_for_element(node)
+	element_context = extract_element_context(node)
+	recorder._last_described = (node, css_selector, element_context)
+	return css_selector, element_context
+
+
 def record_navigation(url: str, new_tab: bool = False) -> PlaywrightStep | None:
 	"""Record a navigation action."""
 	recorder = get_current_recorder()
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording navigation to: {url}")
+	logger.debug("Recording navigation to: %s", url)
 	return recorder.record_goto(url)
 
 
@@ -70,8 +92,7 @@ def record_click_element(node: EnhancedDOMTreeNode) -> PlaywrightStep | None:
 		return None
 	
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
 	description = f"Click {element_context.tag_name}"
 	if element_context.text_content:
@@ -79,7 +100,7 @@ def record_click_element(node: EnhancedDOMTreeNode) -> PlaywrightStep | None:
 	elif element_context.aria_label:
 		description = f"Click '{element_context.aria_label[:30]}'"
 	
-	logger.debug(f"Recording click: {description}")
+	logger.debug("Recording click: %s", description)
 	return recorder.record_click(
 		xpath=xpath,
 		css_selector=css_selector,
@@ -95,13 +116,12 @@ def record_input_text(node: EnhancedDOMTreeNode, text: str, is_sensitive: bool =
 		return None
 	
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
 	display_text = "<sensitive>" if is_sensitive else text
 	description = f"Type '{display_text[:20]}...' into {element_context.tag_name}" if len(display_text) > 20 else f"Type '{display_text}'"
 	
-	logger.debug(f"Recording input: {description}")
+	logger.debug("Recording input: %s", description)
 	return recorder.record_fill(
 		xpath=xpath,
 		value=text,
@@ -118,12 +138,11 @@ def record_select_option(node: EnhancedDOMTreeNode, value: str) -> PlaywrightSte
 		return None
 	
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
 	description = f"Select '{value}' from dropdown"
 	
-	logger.debug(f"Recording select: {description}")
+	logger.debug("Recording select: %s", description)
 	return recorder.record_select(
 		xpath=xpath,
 		value=value,
@@ -146,7 +165,7 @@ def record_key_press(key: str, node: EnhancedDOMTreeNode | None = None) -> Playw
 		xpath = node.xpath
 		css_selector = generate_css_selector_for_element(node)
 	
-	logger.debug(f"Recording key press: {key}")
+	logger.debug("Recording key press: %s", key)
 	return recorder.record_press(
 		key=key,
 		xpath=xpath,
@@ -161,7 +180,7 @@ def record_scroll(direction: str, amount: int = 500) -> PlaywrightStep | None:
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording scroll: {direction} by {amount}px")
+	logger.debug("Recording scroll: %s by %spx", direction, amount)
 	return recorder.record_scroll(
 		direction=direction,
 		amount=amount,
@@ -174,7 +193,7 @@ def record_wait(seconds: int) -> PlaywrightStep | None:
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording wait: {seconds}s")
+	logger.debug("Recording wait: %ss", seconds)
 	return recorder.record_wait(
 		timeout=seconds * 1000,
 		description=f"Wait {seconds} seconds",
@@ -191,7 +210,7 @@ def record_assert_text(
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording assertion: text '{expected_text[:50]}...'")
+	logger.debug("Recording assertion: text '%.50s...'", expected_text)
 	return recorder.record_assert_text_visible(
 		expected_text=expected_text,
 		partial_match=partial_match,
@@ -208,7 +227,7 @@ def record_assert_url(
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording assertion: URL contains '{expected_url}'")
+	logger.debug("Recording assertion: URL contains '%s'", expected_url)
 	return recorder.record_assert_url(
 		expected_url=expected_url,
 		partial_match=partial_match,
@@ -225,10 +244,9 @@ def record_assert_element_visible(
 		return None
 	
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
-	logger.debug(f"Recording assertion: element visible")
+	logger.debug("Recording assertion: element visible")
 	return recorder.record_assert_element_visible(
 		xpath=xpath,
 		css_selector=css_selector,
@@ -251,10 +269,6 @@ def record_done_verification(
 	Recording these as assertions would cause test failures during replay since
 	the LLM's response text is not visible on the page.
 	"""
-	recorder = get_current_recorder()
-	if not recorder:
-		return None
-	
 	# We skip text assertions for 'done' actions because:
 	# 1. The content is usually LLM-generated summary, not actual page text
 	# 2. Verifying LLM text against page content always fails
@@ -263,7 +277,9 @@ def record_done_verification(
 	# Note: URL verification is also skipped because the final URL
 	# depends on the flow and may vary between runs
 	
-	logger.debug(f"Done action recorded (success={success}), no assertion added - actions themselves validate the flow")
+	# Nothing is recorded, so only look up the recorder when the log line would be emitted
+	if logger.isEnabledFor(logging.DEBUG) and get_current_recorder():
+		logger.debug("Done action recorded (success=%s), no assertion added - actions themselves validate the flow", success)
 	return None
 
 
@@ -288,7 +304,7 @@ def record_extract_verification(
 					assertion_text = assertion_text[:idx]
 					break
 		
-		logger.debug(f"Recording extract verification for query: '{query}'")
+		logger.debug("Recording extract verification for query: '%s'", query)
 		return recorder.record_assert_text_visible(
 			expected_text=assertion_text,
 			partial_match=True,
@@ -307,7 +323,7 @@ def record_navigation_verification(
 	if not recorder:
 		return None
 	
-	logger.debug(f"Recording navigation verification for URL: '{url}'")
+	logger.debug("Recording navigation verification for URL: '%s'", url)
 	return recorder.record_assert_url(
 		expected_url=url,
 		partial_match=True,
@@ -326,10 +342,9 @@ def record_click_verification(
 	# For now, we record element visibility verification
 	# In future, could check for state changes, new elements, etc.
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
-	logger.debug(f"Recording click verification for element")
+	logger.debug("Recording click verification for element")
 	return recorder.record_assert_element_visible(
 		xpath=xpath,
 		css_selector=css_selector,
@@ -353,10 +368,9 @@ def record_input_verification(
 		return None
 	
 	xpath = node.xpath
-	css_selector = generate_css_selector_for_element(node)
-	element_context = extract_element_context(node)
+	css_selector, element_context = describe_node(recorder, node)
 	
-	logger.debug(f"Recording input verification")
+	logger.debug("Recording input verification")
 	return recorder.record_assert_value(
 		xpath=xpath,
 		expected_value=expected_value,
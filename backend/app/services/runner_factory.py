@@ -25,6 +25,7 @@ def create_runner(
     screenshot_dir: str = "data/screenshots/runs",
     on_step_start: StepStartCallback | None = None,
     on_step_complete: StepCompleteCallback | None = None,
+    keep_step_results: bool = True,
 ) -> BaseRunner:
     """Create a test runner of the specified type.
 
@@ -34,6 +35,7 @@ def create_runner(
         screenshot_dir: Directory to save screenshots
         on_step_start: Callback called when a step starts
         on_step_complete: Callback called when a step completes
+        keep_step_results: Whether to accumulate step results on the RunResult
 
     Returns:
         An instance of the appropriate runner class
@@ -52,6 +54,7 @@ def create_runner(
             screenshot_dir=screenshot_dir,
             on_step_start=on_step_start,
             on_step_complete=on_step_complete,
+            keep_step_results=keep_step_results,
         )
 
     elif runner_type == RunnerType.CDP:
@@ -61,6 +64,7 @@ def create_runner(
             screenshot_dir=screenshot_dir,
             on_step_start=on_step_start,
             on_step_complete=on_step_complete,
+            keep_step_results=keep_step_results,
         )
 
     else:
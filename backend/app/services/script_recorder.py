@@ -7,17 +7,20 @@ for robust replay and self-healing capabilities.
 
 from dataclasses import dataclass, field
 from typing import Any
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, TypeAdapter
 
 
 class SelectorSet(BaseModel):
 	"""Multiple selectors for the same element, ordered by preference."""
 	primary: str
 	fallbacks: list[str] = []
+	_all_cached: tuple[str, ...] | None = PrivateAttr(default=None)
 	
-	def all_selectors(self) -> list[str]:
-		"""Return all selectors in order of preference."""
-		return [self.primary] + self.fallbacks
+	def all_selectors(self) -> tuple[str, ...]:
+		"""Return all unique selectors in order of preference (built once per instance)."""
+		if self._all_cached is None:
+			self._all_cached = tuple(dict.fromkeys([self.primary, *self.fallbacks]))
+		return self._all_cached
 
 
 class ElementContext(BaseModel):
@@ -30,6 +33,12 @@ class ElementContext(BaseModel):
 	classes: list[str] = []
 	nearby_text: str | None = None
 	parent_tag: str | None = None
+	# Fuzzy selectors derived from this context, memoized by the runners
+	_fuzzy_cached: Any = PrivateAttr(default=None)
+	
+	def has_fuzzy_hints(self) -> bool:
+		"""Whether any field that fuzzy healing can build a selector from is set."""
+		return bool(self.text_content or self.aria_label or self.placeholder or self.role or self.classes)
 	
 
 class AssertionConfig(BaseModel):
@@ -58,12 +67,28 @@ class PlaywrightStep(BaseModel):
 	assertion: AssertionConfig | None = None  # For assert actions
 
 
+# Validates a whole stored script in one pydantic-core call instead of one model call per step
+_STEPS_ADAPTER = TypeAdapter(list[PlaywrightStep])
+
+
+def parse_steps(steps_json: list[dict[str, Any]]) -> list[PlaywrightStep]:
+	"""Build PlaywrightSteps from stored JSON."""
+	return _STEPS_ADAPTER.validate_python(steps_json)
+
+
 @dataclass
 class ScriptRecorder:
-	"""Records browser actions during AI analysis for later replay."""
+	"""Records browser actions during AI analysis for later replay.
+	
+	Steps are built with model_construct(): every field comes from this class, and stored
+	scripts are validated again by parse_steps() when they are loaded for a run.
+	"""
 	
 	steps: list[PlaywrightStep] = field(default_factory=list)
 	_step_index: int = 0
+	# (DOM node, css selector, element context) cache for recording_hooks.describe_node.
+	# Scoped to the recorder and dropped on stop so it can't pin a DOM snapshot.
+	_last_described: tuple[Any, str | None, ElementContext] | None = field(default=None, repr=False)
 	
 	def record_goto(
 		self,
@@ -71,7 +96,7 @@ class ScriptRecorder:
 		wait_for: str = "domcontentloaded",
 	) -> PlaywrightStep:
 		"""Record a navigation action."""
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="goto",
 			url=url,
@@ -105,10 +130,10 @@ class ScriptRecorder:
 					role_selector += f"[name=\"{element_context.text_content}\"]"
 				fallbacks.append(role_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="click",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			element_context=element_context,
 			description=description or "Click element",
 		)
@@ -135,10 +160,10 @@ class ScriptRecorder:
 			if element_context.aria_label:
 				fallbacks.append(f"[aria-label=\"{element_context.aria_label}\"]")
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="fill",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			value=value,
 			element_context=element_context,
 			description=description or f"Fill with '{value[:20]}...'" if len(value) > 20 else f"Fill with '{value}'",
@@ -160,10 +185,10 @@ class ScriptRecorder:
 		if css_selector:
 			fallbacks.append(css_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="select",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			value=value,
 			element_context=element_context,
 			description=description or f"Select '{value}'",
@@ -183,9 +208,9 @@ class ScriptRecorder:
 		selectors = None
 		if xpath:
 			fallbacks = [css_selector] if css_selector else []
-			selectors = SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks)
+			selectors = SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="press",
 			selectors=selectors,
@@ -203,7 +228,7 @@ class ScriptRecorder:
 		description: str | None = None,
 	) -> PlaywrightStep:
 		"""Record a scroll action."""
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="scroll",
 			direction=direction,
@@ -220,7 +245,7 @@ class ScriptRecorder:
 		description: str | None = None,
 	) -> PlaywrightStep:
 		"""Record a wait action."""
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="wait",
 			timeout=timeout,
@@ -242,10 +267,10 @@ class ScriptRecorder:
 		if css_selector:
 			fallbacks.append(css_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="hover",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			element_context=element_context,
 			description=description or "Hover over element",
 		)
@@ -266,13 +291,13 @@ class ScriptRecorder:
 		selectors = None
 		if xpath:
 			fallbacks = [css_selector] if css_selector else []
-			selectors = SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks)
+			selectors = SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="assert",
 			selectors=selectors,
-			assertion=AssertionConfig(
+			assertion=AssertionConfig.model_construct(
 				assertion_type="text_visible",
 				expected_value=expected_text,
 				partial_match=partial_match,
@@ -296,12 +321,12 @@ class ScriptRecorder:
 		if css_selector:
 			fallbacks.append(css_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="assert",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			element_context=element_context,
-			assertion=AssertionConfig(
+			assertion=AssertionConfig.model_construct(
 				assertion_type="element_visible",
 			),
 			description=description or "Assert element is visible",
@@ -319,10 +344,10 @@ class ScriptRecorder:
 		"""Record an assertion about the current URL."""
 		assertion_type = "url_contains" if partial_match else "url_equals"
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="assert",
-			assertion=AssertionConfig(
+			assertion=AssertionConfig.model_construct(
 				assertion_type=assertion_type,
 				expected_value=expected_url,
 				partial_match=partial_match,
@@ -346,12 +371,12 @@ class ScriptRecorder:
 		if css_selector:
 			fallbacks.append(css_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="assert",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
 			element_context=element_context,
-			assertion=AssertionConfig(
+			assertion=AssertionConfig.model_construct(
 				assertion_type="value_equals",
 				expected_value=expected_value,
 			),
@@ -373,11 +398,11 @@ class ScriptRecorder:
 		if css_selector:
 			fallbacks.append(css_selector)
 		
-		step = PlaywrightStep(
+		step = PlaywrightStep.model_construct(
 			index=self._step_index,
 			action="assert",
-			selectors=SelectorSet(primary=f"xpath={xpath}", fallbacks=fallbacks),
-			assertion=AssertionConfig(
+			selectors=SelectorSet.model_construct(primary=f"xpath={xpath}", fallbacks=fallbacks),
+			assertion=AssertionConfig.model_construct(
 				assertion_type="element_count",
 				expected_count=expected_count,
 			),
@@ -395,7 +420,7 @@ class ScriptRecorder:
 	def from_json(cls, steps_json: list[dict[str, Any]]) -> "ScriptRecorder":
 		"""Load recorded steps from JSON."""
 		recorder = cls()
-		recorder.steps = [PlaywrightStep(**step) for step in steps_json]
+		recorder.steps = parse_steps(steps_json)
 		recorder._step_index = len(recorder.steps)
 		return recorder
 	
@@ -403,6 +428,7 @@ class ScriptRecorder:
 		"""Clear all recorded steps."""
 		self.steps = []
 		self._step_index = 0
+		self._last_described = None
 
 
 # Global recorder instance - will be set during test execution
@@ -431,4 +457,6 @@ def stop_recording() -> ScriptRecorder | None:
 	"""Stop recording and return the recorder."""
 	recorder = get_current_recorder()
 	set_current_recorder(None)
+	if recorder:
+		recorder._last_described = None
 	return recorder
@@ -0,0 +1,61 @@
+"""
+Shared fixtures for backend tests.
+
+FakePage stands in for a Playwright Page so locator logic can be tested without
+browser binaries: selectors "appear" at a given delay after the page is created.
+"""
+
+import asyncio
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+
+class FakeLocator:
+	"""The subset of playwright Locator used by SelfHealingLocator."""
+
+	def __init__(self, page: "FakePage", selector: str):
+		self.page = page
+		self.selector = selector
+
+	async def count(self) -> int:
+		return 1 if self.page.is_present(self.selector) else 0
+
+	async def wait_for(self, state: str = "visible", timeout: float = 30000) -> None:
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + timeout / 1000
+		while loop.time() < deadline:
+			if self.page.is_present(self.selector):
+				return
+			await asyncio.sleep(0.01)
+		raise PlaywrightTimeout(f"Timeout {timeout}ms exceeded.")
+
+
+class FakePage:
+	"""A page whose selectors become visible after fixed delays (in seconds).
+
+	fuzzy_probe_result is returned from evaluate(), i.e. the in-page fuzzy probe.
+	"""
+
+	def __init__(self, appear_after: dict[str, float], fuzzy_probe_result=None):
+		self.appear_after = appear_after
+		self.fuzzy_probe_result = fuzzy_probe_result
+		self.located: list[str] = []
+		self._started = asyncio.get_running_loop().time()
+
+	def is_present(self, selector: str) -> bool:
+		delay = self.appear_after.get(selector)
+		return delay is not None and asyncio.get_running_loop().time() - self._started >= delay
+
+	def locator(self, selector: str) -> FakeLocator:
+		self.located.append(selector)
+		return FakeLocator(self, selector)
+
+	async def evaluate(self, expression, arg=None):
+		return self.fuzzy_probe_result
+
+
+@pytest.fixture
+def fake_page():
+	"""Factory for FakePage; must be called from within a running event loop."""
+	return FakePage
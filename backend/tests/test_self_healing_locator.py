@@ -0,0 +1,127 @@
+"""Tests for SelfHealingLocator selector probing, fuzzy healing and the healed-selector memo."""
+
+import pytest
+
+from app.services.playwright_runner import SelfHealingLocator
+from app.services.script_recorder import ElementContext, SelectorSet
+
+
+def _attempts(healer: SelfHealingLocator) -> list[tuple[str, bool]]:
+	return [(attempt.selector, attempt.success) for attempt in healer.heal_attempts]
+
+
+@pytest.mark.asyncio
+async def test_primary_match_is_not_healed(fake_page):
+	page = fake_page({"xpath=/html/body/button": 0, "css=#save": 0})
+	healer = SelfHealingLocator(page, SelectorSet(primary="xpath=/html/body/button", fallbacks=["css=#save"]))
+
+	locator = await healer.locate(timeout=1000)
+
+	assert locator.selector == "xpath=/html/body/button"
+	assert not healer.was_healed()
+	assert _attempts(healer) == [("xpath=/html/body/button", True)]
+
+
+@pytest.mark.asyncio
+async def test_late_fallback_is_found(fake_page):
+	page = fake_page({"css=#ok": 0.3})
+	healer = SelfHealingLocator(page, SelectorSet(primary="xpath=/stale", fallbacks=["css=#ok"]))
+
+	locator = await healer.locate(timeout=1500)
+
+	assert locator is not None and locator.selector == "css=#ok"
+	assert healer.was_healed()
+	assert _attempts(healer) == [("xpath=/stale", False), ("css=#ok", True)]
+
+
+@pytest.mark.asyncio
+async def test_primary_preferred_within_grace_period(fake_page):
+	# The fallback matches first, but the primary turns up inside the grace period
+	page = fake_page({"xpath=/primary": 0.1, "css=#fallback": 0})
+	healer = SelfHealingLocator(page, SelectorSet(primary="xpath=/primary", fallbacks=["css=#fallback"]))
+
+	locator = await healer.locate(timeout=1000)
+
+	assert locator.selector == "xpath=/primary"
+	assert not healer.was_healed()
+
+
+@pytest.mark.asyncio
+async def test_primary_after_grace_period_is_recorded_as_failed(fake_page):
+	page = fake_page({"xpath=/primary": 0.8, "css=#fallback": 0})
+	healer = SelfHealingLocator(page, SelectorSet(primary="xpath=/primary", fallbacks=["css=#fallback"]))
+
+	locator = await healer.locate(timeout=2000)
+
+	assert locator.selector == "css=#fallback"
+	assert healer.was_healed()
+	assert _attempts(healer) == [("xpath=/primary", False), ("css=#fallback", True)]
+
+
+@pytest.mark.asyncio
+async def test_nothing_found_returns_none(fake_page):
+	page = fake_page({})
+	healer = SelfHealingLocator(page, SelectorSet(primary="xpath=/a", fallbacks=["css=#b"]))
+
+	assert await healer.locate(timeout=200) is None
+	assert _attempts(healer) == [("xpath=/a", False), ("css=#b", False)]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_in_page_match_remembers_matched_xpath(fake_page):
+	page = fake_page({}, fuzzy_probe_result=[0, "/html[1]/body[1]/button[2]"])
+	memo: dict[tuple[str, ...], str] = {}
+	selectors = SelectorSet(primary="xpath=/stale")
+	context = ElementContext(tag_name="button", text_content="Save")
+	healer = SelfHealingLocator(page, selectors, context, memo)
+
+	locator = await healer.locate(timeout=200)
+
+	assert locator.selector == "[data-qa-healed='1']"
+	assert healer.successful_selector == "[HEALED] text=Save"
+	assert memo == {selectors.all_selectors(): "xpath=/html[1]/body[1]/button[2]"}
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_falls_back_to_playwright_engines(fake_page):
+	# The in-page probe is stricter (exact, case-sensitive text); Playwright's text= still matches
+	page = fake_page({'button:has-text("Save")': 0}, fuzzy_probe_result=None)
+	memo: dict[tuple[str, ...], str] = {}
+	selectors = SelectorSet(primary="xpath=/stale")
+	context = ElementContext(tag_name="button", text_content="Save")
+	healer = SelfHealingLocator(page, selectors, context, memo)
+
+	locator = await healer.locate(timeout=200)
+
+	assert locator.selector == 'button:has-text("Save")'
+	assert healer.was_healed()
+	assert ("text=Save", False) in _attempts(healer)
+	assert memo == {selectors.all_selectors(): 'button:has-text("Save")'}
+
+
+@pytest.mark.asyncio
+async def test_memo_is_tried_first(fake_page):
+	page = fake_page({"css=#ok": 0})
+	selectors = SelectorSet(primary="xpath=/stale", fallbacks=["css=#ok"])
+	memo = {selectors.all_selectors(): "css=#ok"}
+	healer = SelfHealingLocator(page, selectors, healed_memo=memo)
+
+	locator = await healer.locate(timeout=5000)
+
+	assert locator.selector == "css=#ok"
+	assert page.located == ["css=#ok"]
+	assert healer.was_healed()
+	assert _attempts(healer) == [("css=#ok", True)]
+
+
+@pytest.mark.asyncio
+async def test_stale_memo_is_forgotten(fake_page):
+	page = fake_page({"xpath=/primary": 0})
+	selectors = SelectorSet(primary="xpath=/primary", fallbacks=["css=#gone"])
+	memo = {selectors.all_selectors(): "css=#gone"}
+	healer = SelfHealingLocator(page, selectors, healed_memo=memo)
+
+	locator = await healer.locate(timeout=1000)
+
+	assert locator.selector == "xpath=/primary"
+	assert memo == {}
@@ -0,0 +1,118 @@
+"""Tests for the queued step-callback pipeline shared by the runners."""
+
+import asyncio
+
+import pytest
+
+from app.services.playwright_runner import PlaywrightRunner
+from app.services.script_recorder import PlaywrightStep
+
+
+def _wait_steps(count: int) -> list[PlaywrightStep]:
+	return [PlaywrightStep(index=i, action="wait", timeout=0) for i in range(count)]
+
+
+def _runner(tmp_path, **kwargs) -> PlaywrightRunner:
+	runner = PlaywrightRunner(screenshot_dir=str(tmp_path), **kwargs)
+
+	async def take_screenshot(run_id, step_index, is_error=False):
+		return f"runs/{run_id}_step_{step_index:03d}.jpg"
+
+	runner._take_screenshot = take_screenshot
+	return runner
+
+
+@pytest.mark.asyncio
+async def test_drain_callbacks_runs_in_order(tmp_path):
+	runner = PlaywrightRunner(screenshot_dir=str(tmp_path))
+	calls: list[tuple[str, int]] = []
+
+	async def slow(i):
+		await asyncio.sleep(0.01)
+		calls.append(("async", i))
+
+	def fast(i):
+		calls.append(("sync", i))
+
+	queue: asyncio.Queue = asyncio.Queue()
+	drainer = asyncio.create_task(runner._drain_callbacks(queue))
+	for i in range(3):
+		queue.put_nowait((slow, i))
+		queue.put_nowait((fast, i))
+	await queue.join()
+	drainer.cancel()
+
+	assert calls == [("async", 0), ("sync", 0), ("async", 1), ("sync", 1), ("async", 2), ("sync", 2)]
+
+
+@pytest.mark.asyncio
+async def test_drain_callbacks_keeps_first_error_and_skips_the_rest(tmp_path):
+	runner = PlaywrightRunner(screenshot_dir=str(tmp_path))
+	calls: list[int] = []
+
+	def callback(i):
+		calls.append(i)
+		if i == 1:
+			raise RuntimeError("commit failed")
+
+	queue: asyncio.Queue = asyncio.Queue()
+	drainer = asyncio.create_task(runner._drain_callbacks(queue))
+	for i in range(4):
+		queue.put_nowait((callback, i))
+	await queue.join()
+	drainer.cancel()
+
+	assert calls == [0, 1]
+	with pytest.raises(RuntimeError, match="commit failed"):
+		runner._raise_callback_error()
+
+
+@pytest.mark.asyncio
+async def test_run_delivers_callbacks_in_step_order(tmp_path):
+	events: list[tuple[str, int]] = []
+	runner = _runner(
+		tmp_path,
+		on_step_start=lambda i, step: events.append(("start", i)),
+		on_step_complete=lambda i, result: events.append(("complete", i)),
+	)
+
+	result = await runner.run(_wait_steps(3), "run1")
+
+	assert result.status == "passed"
+	assert events == [
+		("start", 0), ("complete", 0),
+		("start", 1), ("complete", 1),
+		("start", 2), ("complete", 2),
+	]
+
+
+@pytest.mark.asyncio
+async def test_run_fails_when_a_callback_raises(tmp_path):
+	completed: list[int] = []
+
+	async def on_step_complete(i, result):
+		if i == 0:
+			raise RuntimeError("db commit failed")
+		completed.append(i)
+
+	runner = _runner(tmp_path, on_step_complete=on_step_complete)
+
+	result = await runner.run(_wait_steps(3), "run1")
+
+	assert result.status == "failed"
+	assert result.error_message == "db commit failed"
+	assert completed == []
+
+
+@pytest.mark.asyncio
+async def test_run_fails_when_the_last_callback_raises(tmp_path):
+	async def on_step_complete(i, result):
+		if i == 1:
+			raise RuntimeError("websocket closed")
+
+	runner = _runner(tmp_path, on_step_complete=on_step_complete)
+
+	result = await runner.run(_wait_steps(2), "run1")
+
+	assert result.status == "failed"
+	assert result.error_message == "websocket closed"